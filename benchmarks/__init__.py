@@ -0,0 +1,9 @@
+import os
+import glob
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def gullian_sources():
+    patterns = ('std/*.gullian', 'examples/*.gullian', 'cparser/src/*.gullian', 'selfhost/src/*.gullian')
+
+    return sorted(path for pattern in patterns for path in glob.glob(os.path.join(ROOT, pattern)))
@@ -0,0 +1,120 @@
+"""
+Stores the ASTs of the repository sources in an AstArena and checks that loading, cloning and serializing
+give back the same ASTs. Then compares cloning function bodies with copy.deepcopy, and the memory of the
+arena with the memory of the dataclasses.
+
+    $ python -m benchmarks.arena [--repeat N]
+"""
+
+from argparse import ArgumentParser
+from collections import Counter
+import tracemalloc
+import copy
+import time
+
+from gullian.compilation import Compilation
+from gullian.checker import Module
+from gullian.parser import FunctionDeclaration
+from gullian.arena import AstArena, ArenaVisitor
+
+from . import gullian_sources
+
+argparser = ArgumentParser('benchmarks.arena')
+argparser.add_argument('--repeat', type=int, default=20)
+
+class KindCounter(ArenaVisitor):
+    def __init__(self, arena: AstArena):
+        super().__init__(arena)
+        self.counts = Counter()
+
+    def generic_visit(self, handle: int):
+        self.counts[self.arena.kind(handle).__name__] += 1
+
+        return super().generic_visit(handle)
+
+def parse_sources():
+    compilation = Compilation(mapped=False)
+
+    for path in gullian_sources():
+        if '/cparser/' in path or '/selfhost/' in path:
+            continue
+
+        file_string = open(path).read()
+        module = Module.new('benchmark', compilation)
+
+        yield file_string, module, compilation.parse(file_string, module)
+
+def build_arenas():
+    arenas = []
+
+    for file_string, _, asts in parse_sources():
+        arena = AstArena.new(file_string)
+
+        for ast in asts:
+            arena.store(ast)
+
+        arenas.append(arena)
+
+    return arenas
+
+def measure_memory(build):
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, current
+
+def main():
+    arguments = argparser.parse_args()
+    bodies = []
+    counter_totals = Counter()
+
+    for file_string, module, asts in parse_sources():
+        arena = AstArena.new(file_string)
+        handles = [arena.store(ast) for ast in asts]
+
+        assert [arena.load(handle, module) for handle in handles] == list(asts), 'loaded ASTs differ from the stored ones'
+
+        reloaded = AstArena.loads(arena.dumps())
+        assert [reloaded.load(handle, module) for handle in handles] == list(asts), 'deserialized ASTs differ from the stored ones'
+
+        for handle, ast in zip(handles, asts):
+            assert arena.load(arena.clone(handle), module) == ast, 'cloned AST differs from the original'
+
+            if type(ast) is FunctionDeclaration:
+                bodies.append((arena, handle, module, ast.body))
+
+        counter = KindCounter(arena)
+
+        for handle in handles:
+            counter.visit(handle)
+
+        counter_totals.update(counter.counts)
+
+    print(f'{sum(counter_totals.values())} nodes checked, {len(bodies)} function declarations')
+
+    start = time.perf_counter()
+
+    for _ in range(arguments.repeat):
+        for _, _, _, body in bodies:
+            copy.deepcopy(body)
+
+    deepcopy_time = time.perf_counter() - start
+    start = time.perf_counter()
+
+    for _ in range(arguments.repeat):
+        for arena, handle, _, _ in bodies:
+            arena.clone(handle)
+
+    clone_time = time.perf_counter() - start
+
+    print(f'cloning function bodies: deepcopy {deepcopy_time * 1000:.2f}ms, arena {clone_time * 1000:.2f}ms')
+
+    asts, objects_memory = measure_memory(lambda: [asts for _, _, asts in parse_sources()])
+    arenas, arena_memory = measure_memory(build_arenas)
+
+    print(f'memory: dataclasses {objects_memory / 2**10:.1f} KiB, arena {arena_memory / 2**10:.1f} KiB')
+
+if __name__ == '__main__':
+    main()
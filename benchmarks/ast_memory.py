@@ -0,0 +1,75 @@
+"""
+Reports the memory held by the ASTs of the std library: the bytes of every kind of node, counting its
+__dict__ when it has one, and the total retained after parsing as measured by tracemalloc.
+
+    $ python -m benchmarks.ast_memory [--copies N]
+"""
+
+from argparse import ArgumentParser
+from collections import Counter
+from enum import Enum
+import tracemalloc
+import sys
+
+from gullian.lexer import SymbolTable
+from gullian.compilation import Compilation
+from gullian.checker import Module
+
+from . import gullian_sources
+
+NODE_MODULES = {'gullian.parser', 'gullian.lexer'}
+
+argparser = ArgumentParser('benchmarks.ast_memory')
+argparser.add_argument('--copies', type=int, default=10, help='how many times the std library is parsed and kept alive')
+
+def node_size(node) -> int:
+    return sys.getsizeof(node) + (sys.getsizeof(node.__dict__) if hasattr(node, '__dict__') else 0)
+
+def walk(asts):
+    """Yields every node, token and name of the ASTs once. Modules, kinds and the symbol table are shared, they are not counted"""
+
+    seen, stack = set(), list(asts)
+
+    while stack:
+        node = stack.pop()
+
+        if type(node) in (list, tuple):
+            stack.extend(node)
+        elif type(node) is dict:
+            stack.extend(node.keys())
+            stack.extend(node.values())
+        elif type(node).__module__ in NODE_MODULES and id(node) not in seen and not isinstance(node, (Module, Enum, SymbolTable)):
+            seen.add(id(node))
+            yield node
+
+            slots = [slot for cls in type(node).__mro__ for slot in getattr(cls, '__slots__', ())]
+            attributes = node.__dict__.values() if hasattr(node, '__dict__') else (getattr(node, slot) for slot in slots)
+            stack.extend(attribute for attribute in attributes if attribute is not None)
+
+def parse_std(compilation: Compilation):
+    return [compilation.parse(open(path).read(), Module.new('benchmark', compilation)) for path in gullian_sources() if '/std/' in path]
+
+def main():
+    arguments = argparser.parse_args()
+    compilation = Compilation(mapped=False)
+
+    sizes, counts = Counter(), Counter()
+
+    for node in walk(parse_std(compilation)):
+        sizes[type(node).__name__] += node_size(node)
+        counts[type(node).__name__] += 1
+
+    for name, count in counts.most_common():
+        print(f'{name:>20}: {count:6} nodes, {sizes[name] / count:6.1f} B/node')
+
+    print(f'{"total":>20}: {sum(counts.values()):6} nodes, {sum(sizes.values()) / 2**10:.1f} KiB, {sum(sizes.values()) / sum(counts.values()):.1f} B/node')
+
+    tracemalloc.start()
+    kept = [parse_std(compilation) for _ in range(arguments.copies)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f'{arguments.copies} parses of std kept alive: {current / 2**20:.2f} MiB, {current / arguments.copies / 2**10:.1f} KiB each')
+
+if __name__ == '__main__':
+    main()
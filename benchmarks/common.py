@@ -0,0 +1,37 @@
+"""Setup and timing shared by the benchmarks"""
+
+from argparse import ArgumentParser
+import time
+import os
+
+from . import ROOT
+
+def add_repeat(argparser: ArgumentParser, default: int):
+    argparser.add_argument('--repeat', type=int, default=default, help='the best of this many runs is reported')
+
+def run_from_root():
+    # Imports of std are resolved from the working directory
+    os.chdir(ROOT)
+
+def best_of(repeat: int, function, *arguments) -> tuple[float, object]:
+    """The shortest time of repeat calls of function, and what the last one returned"""
+
+    best = float('inf')
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*arguments)
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+def best_timed(repeat: int, function, *arguments) -> tuple[float, object]:
+    """Like best_of(), for functions timing the part that matters themselves and returning (seconds, result)"""
+
+    best = float('inf')
+
+    for _ in range(repeat):
+        seconds, result = function(*arguments)
+        best = min(best, seconds)
+
+    return best, result
@@ -0,0 +1,125 @@
+"""
+Generates Gullian programs of a given shape, to measure how the front-end scales with each feature.
+
+    $ python -m benchmarks.corpus [--functions N] [--structs N] [--depth N] [--chain N] > program.gullian
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+
+PRELUDE = '''import std.io
+import std.fmt
+
+struct Box[T] {
+    value: T
+}
+
+struct Pair[A, B] {
+    first: A,
+    second: B
+}
+
+fun Box.get[T](self: Box[T]) : T {
+    return self.value
+}
+'''
+
+@dataclass
+class Shape:
+    functions: int=100
+    structs: int=20
+    depth: int=4
+    chain: int=20
+
+def nested_type(depth: int) -> str:
+    """Box and Pair nested depth times around an int, like Box[Pair[int, Box[int]]]"""
+
+    if depth == 0:
+        return 'int'
+    elif depth % 2:
+        return f'Box[{nested_type(depth -1)}]'
+
+    return f'Pair[int, {nested_type(depth -1)}]'
+
+def nested_literal(depth: int) -> str:
+    if depth == 0:
+        return '0'
+    elif depth % 2:
+        return f'{nested_type(depth)} {{ {nested_literal(depth -1)} }}'
+
+    return f'{nested_type(depth)} {{ 0, {nested_literal(depth -1)} }}'
+
+def generate_struct(index: int) -> str:
+    return f'''
+struct Point{index} {{
+    x: int,
+    y: int,
+    label: str
+}}
+
+fun Point{index}.to_string(self: Point{index}) : str {{
+    return "Point{index} {{ ".cat(self.label).cat(", ".cat(self.x.to_string())).cat(" }}")
+}}
+'''
+
+def generate_function(index: int, shape: Shape) -> str:
+    chain = ''.join(f'.cat("{link}")' for link in range(shape.chain))
+
+    return f'''
+fun function{index}(a: int, b: int) : int {{
+    let c = a + b * {index}
+
+    while c > 10 {{
+        c -= 1
+    }}
+
+    if c == {index} {{
+        return c - 1
+    }}
+
+    return c
+}}
+
+fun nested{index}() : {nested_type(shape.depth)} {{
+    let value = {nested_literal(shape.depth)}
+
+    return value
+}}
+
+fun chain{index}() : str {{
+    return "{index}"{chain}
+}}
+'''
+
+def generate(shape: Shape) -> str:
+    parts = [PRELUDE]
+    parts.extend(generate_struct(index) for index in range(shape.structs))
+    parts.extend(generate_function(index, shape) for index in range(shape.functions))
+
+    parts.append('\nfun main() : int {\n')
+
+    for index in range(shape.structs):
+        parts.append(f'    let point{index} = Point{index} {{ {index}, 0, "p{index}" }}\n')
+        parts.append(f'    io.puts(point{index}.to_string())\n')
+
+    for index in range(shape.functions):
+        parts.append(f'    io.puts(function{index}({index}, 1).to_string())\n')
+        parts.append(f'    io.puts(chain{index}())\n')
+
+    parts.append('}\n')
+
+    return ''.join(parts)
+
+argparser = ArgumentParser('benchmarks.corpus')
+argparser.add_argument('--functions', type=int, default=Shape.functions)
+argparser.add_argument('--structs', type=int, default=Shape.structs)
+argparser.add_argument('--depth', type=int, default=Shape.depth, help='nesting of the generic types')
+argparser.add_argument('--chain', type=int, default=Shape.chain, help='length of the .cat() chains')
+
+def main():
+    arguments = argparser.parse_args()
+
+    print(generate(Shape(arguments.functions, arguments.structs, arguments.depth, arguments.chain)), end='')
+
+if __name__ == '__main__':
+    main()
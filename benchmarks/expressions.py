@@ -0,0 +1,111 @@
+"""
+Parses generated expressions of 10k terms: operator chains, call chains and attribute chains. Before timing,
+random arithmetic expressions are parsed and evaluated to check precedence and associativity against Python.
+
+    $ python -m benchmarks.expressions [--terms N] [--seed N]
+"""
+
+from argparse import ArgumentParser
+import operator
+import random
+import time
+
+from gullian.source import Source
+from gullian.lexer import TableLexer, Literal
+from gullian.parser import Parser, BinaryOperator, UnaryOperator
+from gullian.checker import Module
+
+OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '%': operator.mod,
+    '&': operator.and_,
+    '|': operator.or_,
+    '^': operator.xor,
+    '<<': operator.lshift,
+    '>>': operator.rshift,
+}
+
+argparser = ArgumentParser('benchmarks.expressions')
+argparser.add_argument('--terms', type=int, default=10_000)
+argparser.add_argument('--seed', type=int, default=0)
+
+def parse(file_string: str):
+    module = Module.new('benchmark')
+    tokens = tuple(TableLexer(Source(file_string), module).lex())
+
+    return tuple(Parser.new(tokens, module).parse())
+
+def evaluate(expression):
+    # Iterative, the trees of left associative chains are as deep as they are long
+    stack, values = [(expression, False)], []
+
+    while stack:
+        expression, visited = stack.pop()
+
+        if type(expression) is Literal:
+            values.append(expression.value)
+        elif type(expression) is UnaryOperator:
+            if visited:
+                values.append(-values.pop())
+            else:
+                stack.extend(((expression, True), (expression.expression, False)))
+        elif visited:
+            right, left = values.pop(), values.pop()
+            values.append(OPERATORS[expression.operator.format](left, right))
+        else:
+            stack.extend(((expression, True), (expression.right, False), (expression.left, False)))
+
+    return values[0]
+
+def random_expression(depth: int) -> str:
+    if depth == 0 or random.random() < 0.3:
+        return str(random.randrange(1, 9))
+    elif random.random() < 0.2:
+        return f'({random_expression(depth -1)})'
+    elif random.random() < 0.1:
+        return f'-{random_expression(0)}'
+
+    symbol = random.choice(tuple(OPERATORS))
+
+    if symbol == '<<' or symbol == '>>':
+        # Parenthesized so that the shift count stays small and positive
+        return f'({random_expression(depth -1)} {symbol} {random.randrange(0, 4)})'
+
+    return f'{random_expression(depth -1)} {symbol} {random_expression(depth -1)}'
+
+def check_precedence(count: int):
+    for _ in range(count):
+        source = random_expression(6)
+        declaration, = parse(f'let value = {source}')
+
+        try:
+            expected = eval(source)
+        except ZeroDivisionError:
+            continue
+
+        assert evaluate(declaration.value) == expected, f'{source} evaluates to {evaluate(declaration.value)}, expected {expected}'
+
+def main():
+    arguments = argparser.parse_args()
+    random.seed(arguments.seed)
+
+    check_precedence(500)
+
+    terms = arguments.terms
+    programs = {
+        'operators': 'let value = ' + ' '.join(f'{term} {random.choice(tuple(OPERATORS))}' for term in range(terms)) + ' 0',
+        'not': 'let value = ' + ' and '.join(f'not a{term} == b' for term in range(terms)),
+        'calls': 'let value = ""' + '.cat("x")' * terms,
+        'attributes': 'let value = a' + '.b' * terms,
+    }
+
+    for name, program in programs.items():
+        start = time.perf_counter()
+        parse(program)
+
+        print(f'{name:>10}: {terms} terms parsed in {time.perf_counter() - start:.3f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Times the lexer, parser, checker and C generator separately over a generated program and reports
+their throughput and peak memory. Results can be saved as JSON to compare them between commits.
+
+    $ python -m benchmarks.frontend [--functions N] [--structs N] [--depth N] [--chain N] [--repeat N] [--json FILE] [--compare FILE]
+
+The checker stage also loads the std modules the program imports, from source since the cache is off.
+"""
+
+from argparse import ArgumentParser
+from dataclasses import asdict, fields, is_dataclass
+import subprocess
+import tracemalloc
+import platform
+import json
+import time
+
+from gullian.lexer import LEXERS
+from gullian.parser import Parser
+from gullian.checker import Checker, Module
+from gullian.compilation import Compilation
+from gullian.codegen.cgen import CGen
+
+from . import ROOT
+from .corpus import Shape, generate
+from .common import add_repeat, run_from_root
+
+argparser = ArgumentParser('benchmarks.frontend')
+argparser.add_argument('--functions', type=int, default=Shape.functions)
+argparser.add_argument('--structs', type=int, default=Shape.structs)
+argparser.add_argument('--depth', type=int, default=Shape.depth, help='nesting of the generic types')
+argparser.add_argument('--chain', type=int, default=Shape.chain, help='length of the .cat() chains')
+argparser.add_argument('--lexer', choices=tuple(LEXERS), default='table')
+argparser.add_argument('--json', type=str, help='file the results are written to')
+argparser.add_argument('--compare', type=str, help='results of a previous run, the time of every stage is compared to it')
+add_repeat(argparser, 3)
+
+def count_nodes(ast) -> int:
+    if type(ast) in (list, tuple):
+        return sum(count_nodes(item) for item in ast)
+    elif not is_dataclass(ast) or type(ast).__module__ != 'gullian.parser':
+        return 0
+
+    return 1 + sum(count_nodes(getattr(ast, field.name)) for field in fields(ast))
+
+def run_stages(file_string: str, lexer: str):
+    """Runs every stage once, yields (stage, seconds, result)"""
+
+    compilation = Compilation(lexer=lexer, cache=False)
+    module = Module.new('main', compilation)
+
+    start = time.perf_counter()
+    tokens = tuple(compilation.lex(file_string, module))
+    yield 'lexer', time.perf_counter() - start, tokens
+
+    start = time.perf_counter()
+    asts = tuple(Parser.new(tokens, module).parse())
+    yield 'parser', time.perf_counter() - start, asts
+
+    start = time.perf_counter()
+    checked = tuple(Checker(asts, module).check())
+    yield 'checker', time.perf_counter() - start, checked
+
+    start = time.perf_counter()
+    # CGen.gen() defaults to a list shared by every call, a fresh one generates the modules again
+    code = tuple(CGen(module).gen(generated_modules=[]))
+    yield 'cgen', time.perf_counter() - start, code
+
+def measure(file_string: str, lexer: str, repeat: int):
+    results = {}
+
+    for _ in range(repeat):
+        for stage, seconds, result in run_stages(file_string, lexer):
+            if stage not in results or seconds < results[stage]['seconds']:
+                results[stage] = {'seconds': seconds, 'items': len(result)}
+
+    stages = run_stages(file_string, lexer)
+    tracemalloc.start()
+
+    while True:
+        tracemalloc.reset_peak()
+        held = tracemalloc.get_traced_memory()[0]
+
+        try:
+            stage, _, result = next(stages)
+        except StopIteration:
+            break
+
+        # Only what the stage allocates on top of the results of the previous ones
+        results[stage]['peak_bytes'] = tracemalloc.get_traced_memory()[1] - held
+
+        if stage == 'parser':
+            results[stage]['nodes'] = count_nodes(result)
+
+    tracemalloc.stop()
+
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def main():
+    arguments = argparser.parse_args()
+    shape = Shape(arguments.functions, arguments.structs, arguments.depth, arguments.chain)
+    file_string = generate(shape)
+
+    run_from_root()
+
+    results = measure(file_string, arguments.lexer, arguments.repeat)
+    tokens, nodes = results['lexer']['items'], results['parser']['nodes']
+
+    print(f'{len(file_string)} chars, {tokens} tokens, {nodes} AST nodes')
+
+    for stage, result in results.items():
+        rate = {'lexer': f"{tokens / result['seconds']:12.0f} tokens/s", 'parser': f"{nodes / result['seconds']:12.0f} nodes/s"}.get(stage, ' ' * 20)
+
+        print(f"{stage:>8}: {result['seconds']:.4f}s {rate} {result['peak_bytes'] / 2**20:8.2f} MiB peak")
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            previous = json.load(file)
+
+        if previous['shape'] != asdict(shape):
+            print(f"warning: {arguments.compare} was measured on a different shape {previous['shape']}")
+
+        for stage, result in results.items():
+            before = previous['stages'][stage]['seconds']
+
+            print(f"{stage:>8}: {before:.4f}s at {previous['revision']} -> {result['seconds']:.4f}s ({result['seconds'] / before:.2f}x)")
+
+    if arguments.json:
+        with open(arguments.json, 'w') as file:
+            json.dump({
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'shape': asdict(shape),
+                'lexer': arguments.lexer,
+                'chars': len(file_string),
+                'tokens': tokens,
+                'nodes': nodes,
+                'stages': results,
+            }, file, indent=4)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Times the front-end over a generated project of many modules, with the imported modules parsed serially by the
+checker and then in worker processes by Compilation.parse_imports(). Both must produce the same C.
+
+    $ python -m benchmarks.imports [--modules N] [--functions N] [--jobs N] [--repeat N]
+
+The parsed-module cache is off. Workers only help on machines with as many free cores.
+"""
+
+from argparse import ArgumentParser
+import tempfile
+import os
+
+from gullian.checker import Checker, Module
+from gullian.compilation import Compilation
+from gullian.codegen.cgen import CGen
+
+from . import ROOT
+from .corpus import PRELUDE, Shape, generate_function
+from .common import add_repeat, run_from_root, best_of
+
+argparser = ArgumentParser('benchmarks.imports')
+argparser.add_argument('--modules', type=int, default=24)
+argparser.add_argument('--functions', type=int, default=20, help='functions of each module')
+argparser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='worker processes of the parallel run')
+add_repeat(argparser, 3)
+
+def write_project(directory: str, modules: int, functions: int) -> str:
+    """Writes the modules in a project package of directory, they import the ones after them. Returns the main file"""
+
+    os.makedirs(os.path.join(directory, 'project'))
+    shape = Shape(functions=functions, depth=2, chain=5)
+
+    for index in range(modules):
+        imports = ''.join(f'import project.module{imported}\n' for imported in range(index + 1, min(index + 3, modules)))
+
+        with open(os.path.join(directory, 'project', f'module{index}.gullian'), 'w') as file:
+            file.write(imports + PRELUDE + ''.join(generate_function(function, shape) for function in range(functions)))
+
+    with open(os.path.join(directory, 'main.gullian'), 'w') as file:
+        file.write(''.join(f'import project.module{index}\n' for index in range(modules)))
+        file.write('import std.io\n\nfun main() : int {\n    io.puts(module0.chain0())\n}\n')
+
+    return os.path.join(directory, 'main.gullian')
+
+def compile_(path: str, parse_jobs: int) -> str:
+    compilation = Compilation(cache=False, parse_jobs=parse_jobs)
+    module = Module.new('main', compilation)
+    file_string = compilation.load(path)
+
+    compilation.parse_imports(file_string)
+    tuple(Checker(compilation.parse(file_string, module), module).check())
+
+    return ''.join(CGen(module).gen(generated_modules=[]))
+
+def main():
+    arguments = argparser.parse_args()
+    # std is imported from the repository, the project from the working directory
+    os.environ.setdefault('GULLIAN_HOME', ROOT)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_project(directory, arguments.modules, arguments.functions)
+        os.chdir(directory)
+        outputs = []
+
+        for parse_jobs in (1, arguments.jobs):
+            best, output = best_of(arguments.repeat, compile_, path, parse_jobs)
+            outputs.append(output)
+            print(f'{parse_jobs:>3} parse jobs: {arguments.modules} modules compiled in {best * 1000:.2f}ms')
+
+        run_from_root()
+
+    assert outputs[0] == outputs[1], 'modules parsed by workers generated different C'
+
+if __name__ == '__main__':
+    main()
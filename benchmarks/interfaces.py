@@ -0,0 +1,65 @@
+"""
+Times checking a small program that imports std without the cache, with an empty cache and with the interfaces
+the first compile saved, then checks that the three generate the same C.
+
+    $ python -m benchmarks.interfaces [--repeat N]
+"""
+
+from argparse import ArgumentParser
+import tempfile
+import shutil
+import time
+
+from gullian.checker import Checker, Module
+from gullian.compilation import Compilation
+from gullian.codegen.cgen import CGen
+
+from .common import add_repeat, run_from_root, best_timed
+
+PROGRAM = '''import std.io
+import std.fmt
+import std.vec
+
+fun main() : int {
+    let numbers = vec.new(1)
+
+    numbers.push(2)
+
+    for number in numbers.iter() {
+        io.puts(number.ok.to_string())
+    }
+}
+'''
+
+argparser = ArgumentParser('benchmarks.interfaces')
+add_repeat(argparser, 10)
+
+def compile_(cache: bool, cache_directory: str, cold: bool):
+    if cold:
+        shutil.rmtree(cache_directory, ignore_errors=True)
+
+    compilation = Compilation(cache=cache, cache_directory=cache_directory)
+    module = Module.new('main', compilation)
+
+    start = time.perf_counter()
+    tuple(Checker(compilation.parse(PROGRAM, module), module).check())
+    seconds = time.perf_counter() - start
+
+    return seconds, ''.join(CGen(module).gen(generated_modules=[]))
+
+def main():
+    arguments = argparser.parse_args()
+    run_from_root()
+
+    with tempfile.TemporaryDirectory() as cache_directory:
+        results = {}
+
+        for run, cache in (('no cache', False), ('cold', True), ('warm', True)):
+            best, results[run] = best_timed(arguments.repeat, compile_, cache, cache_directory, run == 'cold')
+
+            print(f'{run:>8}: checked in {best * 1000:.2f}ms')
+
+    assert len(set(results.values())) == 1, 'interfaces generated different C'
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares eager and lazy parsing of function bodies on a program that imports all of std but calls a few of its
+functions, then checks that both produce the same C.
+
+    $ python -m benchmarks.lazy [--repeat N]
+
+The parsed-module cache is off, every module is parsed again on each run. The checker still checks every function
+that is not generic, so only the bodies of generic functions that are never instantiated are skipped by it.
+"""
+
+from argparse import ArgumentParser
+import glob
+import os
+
+from gullian.parser import FunctionDeclaration, LazyBody
+from gullian.checker import Checker, Module
+from gullian.compilation import Compilation
+from gullian.codegen.cgen import CGen
+
+from . import ROOT
+from .common import add_repeat, run_from_root, best_of
+
+argparser = ArgumentParser('benchmarks.lazy')
+add_repeat(argparser, 20)
+
+def program() -> str:
+    imports = ''.join(f'import std.{os.path.basename(path)[:-len(".gullian")]}\n' for path in sorted(glob.glob(os.path.join(ROOT, 'std', '*.gullian'))))
+
+    return imports + '\nfun main() : int {\n    io.puts("hello")\n}\n'
+
+class RecordingCompilation(Compilation):
+    """Keeps the ASTs of every module it parses, to count the bodies that were never parsed"""
+
+    def parse(self, file_string: str, module: Module):
+        asts = super().parse(file_string, module)
+        self.parsed.extend(asts)
+
+        return asts
+
+def compile_(file_string: str, lazy_bodies: bool) -> Module:
+    compilation = RecordingCompilation(cache=False, lazy_bodies=lazy_bodies)
+    compilation.parsed = []
+    module = Module.new('main', compilation)
+
+    tuple(Checker(compilation.parse(file_string, module), module).check())
+
+    return module
+
+def count_bodies(module: Module):
+    """Function bodies of the whole compilation, and how many of them are still unparsed"""
+
+    functions = [ast for ast in module.compilation.parsed if type(ast) is FunctionDeclaration]
+
+    return len(functions), sum(type(function.body) is LazyBody and function.body.body is None for function in functions)
+
+def parse_std(lazy_bodies: bool):
+    compilation = Compilation(cache=False, lazy_bodies=lazy_bodies)
+
+    for path in sorted(glob.glob(os.path.join(ROOT, 'std', '*.gullian'))):
+        with open(path) as file:
+            compilation.parse(file.read(), Module.new('std', compilation))
+
+def main():
+    arguments = argparser.parse_args()
+    file_string = program()
+    run_from_root()
+
+    for lazy_bodies in (False, True):
+        parsing, _ = best_of(arguments.repeat, parse_std, lazy_bodies)
+        checking, module = best_of(arguments.repeat, compile_, file_string, lazy_bodies)
+        bodies, skipped = count_bodies(module)
+
+        print(f"{'lazy' if lazy_bodies else 'eager':>5}: std parsed in {parsing * 1000:.2f}ms, program checked in {checking * 1000:.2f}ms, {skipped} of {bodies} function bodies never parsed")
+
+    eager, lazy = (''.join(CGen(compile_(file_string, lazy_bodies)).gen(generated_modules=[])) for lazy_bodies in (False, True))
+    assert eager == lazy, 'lazy bodies generated different C'
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Compares the lexer engines side by side: checks that every engine emits the same token stream
+for the sources of the repository and reports the time spent by each one.
+
+    $ python -m benchmarks.lexer [--repeat N]
+"""
+
+from argparse import ArgumentParser
+import time
+
+from gullian.source import Source
+from gullian.lexer import LEXERS, LEXERS_OF_BYTES
+from gullian.checker import Module
+
+from . import gullian_sources
+
+argparser = ArgumentParser('benchmarks.lexer')
+argparser.add_argument('--repeat', type=int, default=50)
+
+def signature(tokens):
+    return [(type(token).__name__, token.format, token.line) for token in tokens]
+
+def lex(engine: str, file_string: str):
+    return tuple(LEXERS[engine](Source(file_string), Module.new('benchmark')).lex())
+
+def main():
+    arguments = argparser.parse_args()
+    sources = {path: open(path).read() for path in gullian_sources()}
+
+    for path, file_string in sources.items():
+        signatures = {engine: signature(lex(engine, file_string)) for engine in LEXERS}
+        signatures |= {f'{engine} (bytes)': signature(lex(engine, file_string.encode())) for engine in LEXERS_OF_BYTES}
+        reference = signatures['source']
+
+        for engine, engine_signature in signatures.items():
+            if engine_signature != reference:
+                raise AssertionError(f'lexer engine {engine!r} differs from the source engine for {path}')
+
+    n_tokens = sum(len(lex('source', file_string)) for file_string in sources.values())
+
+    print(f'{len(sources)} files, {n_tokens} tokens, {arguments.repeat} repeats, identical output for every engine')
+
+    for engine in LEXERS:
+        start = time.perf_counter()
+
+        for _ in range(arguments.repeat):
+            for file_string in sources.values():
+                lex(engine, file_string)
+
+        elapsed = time.perf_counter() - start
+
+        print(f'{engine:>8}: {elapsed:8.3f}s  {n_tokens * arguments.repeat / elapsed:12.0f} tokens/s')
+
+if __name__ == '__main__':
+    main()
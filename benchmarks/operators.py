@@ -0,0 +1,60 @@
+"""
+Microbenchmark of Lexer.scan_token on punctuation dense input. The operator trie is compared against
+the previous strategy, which tried every entry of TOKENKIND_SORTED with capture() and release().
+
+    $ python -m benchmarks.operators [--tokens N] [--repeat N]
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+import random
+
+from gullian.source import Source
+from gullian.lexer import Lexer, Token, TokenKind, TOKENKIND_SORTED
+from gullian.checker import Module
+
+from .common import add_repeat, best_of
+
+argparser = ArgumentParser('benchmarks.operators')
+argparser.add_argument('--tokens', type=int, default=20000)
+add_repeat(argparser, 5)
+
+@dataclass
+class SortedScanLexer(Lexer):
+    def scan_token(self, char: str):
+        self.source.release()
+
+        for tokenkind in TOKENKIND_SORTED:
+            if self.source.capture(len(tokenkind.value)) == tokenkind.value:
+                return Token(tokenkind, self.line)
+            
+            self.source.release(len(tokenkind.value))
+        
+        raise SyntaxError(f"invalid token {self.source.capture()!r}. at line {self.line} in module {self.module.name}")
+
+def punctuation_source(n_tokens: int):
+    generator = random.Random(0)
+    operators = [tokenkind.value for tokenkind in TokenKind.__members__.values()]
+
+    # Operators are separated by a blank so that maximal munch can't glue two of them together
+    return '\n'.join(' '.join(generator.choice(operators) for _ in range(16)) for _ in range(n_tokens // 16))
+
+def lex(lexer_class: type, file_string: str):
+    return tuple(lexer_class(Source(file_string), Module.new('benchmark')).lex())
+
+def main():
+    arguments = argparser.parse_args()
+    file_string = punctuation_source(arguments.tokens)
+
+    sorted_time, sorted_tokens = best_of(arguments.repeat, lex, SortedScanLexer, file_string)
+    trie_time, trie_tokens = best_of(arguments.repeat, lex, Lexer, file_string)
+
+    if [token.kind for token in sorted_tokens] != [token.kind for token in trie_tokens]:
+        raise AssertionError('operator trie and sorted scan disagree')
+
+    print(f'{len(trie_tokens)} operators')
+    print(f'sorted scan: {sorted_time:8.3f}s  {len(trie_tokens) / sorted_time:12.0f} tokens/s')
+    print(f'  trie scan: {trie_time:8.3f}s  {len(trie_tokens) / trie_time:12.0f} tokens/s  ({sorted_time / trie_time:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Lexes a large source serially and in parallel chunks, checks that both give the same TokenBuffer and
+compares their timings. Small sources with literals and comments around newlines are checked as well,
+lexed in parallel regardless of their size.
+
+    $ python -m benchmarks.parallel [--copies N] [--workers N]
+"""
+
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import time
+
+from gullian.source import Source
+from gullian.lexer import TableLexer
+from gullian.checker import Module
+from gullian.parallel import lex_parallel
+
+from . import gullian_sources
+
+TRICKY_SOURCES = (
+    'let a = "multi\nline\ntext"\nlet b = 1\n',
+    "# comment with a quote \" \nlet c = 'single\n\\'quoted'\n# \n\n",
+    'fun f() {\n    return "\\"\n#"\n}\n# trailing comment',
+    'let d = "unterminated\n\nlet e = 2\n',
+)
+
+argparser = ArgumentParser('benchmarks.parallel')
+argparser.add_argument('--copies', type=int, default=100, help='how many times the repository sources are repeated')
+argparser.add_argument('--workers', type=int, default=4)
+
+def signature(buffer):
+    return tuple(buffer.codes), tuple(buffer.starts), tuple(buffer.ends), tuple(buffer.lines), tuple(buffer.symbols.values)
+
+def check(text, executor, workers):
+    serial = TableLexer(Source(text), Module.new('benchmark')).lex_buffer()
+    parallel = lex_parallel(text, Module.new('benchmark'), executor, workers, threshold=0)
+
+    assert signature(serial) == signature(parallel), f'parallel lexing differs from serial lexing on {text[:40]!r}'
+
+def main():
+    arguments = argparser.parse_args()
+    file_string = '\n'.join(open(path).read() for path in gullian_sources() if '/std/' in path) * arguments.copies
+
+    with ProcessPoolExecutor(arguments.workers) as executor:
+        for text in TRICKY_SOURCES:
+            for workers in range(2, 8):
+                check(text, executor, workers)
+                check(text.replace('\n', '\r\n').encode(), executor, workers)
+
+        start = time.perf_counter()
+        serial = TableLexer(Source(file_string), Module.new('benchmark')).lex_buffer()
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = lex_parallel(file_string, Module.new('benchmark'), executor, arguments.workers)
+        parallel_time = time.perf_counter() - start
+
+    assert signature(serial) == signature(parallel), 'parallel lexing differs from serial lexing'
+
+    print(f'{len(file_string)} chars, {len(serial)} tokens, serial {serial_time:.3f}s, {arguments.workers} workers {parallel_time:.3f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Times the parser alone over the std library and the examples, the tokens are lexed beforehand.
+
+    $ python -m benchmarks.parser [--repeat N]
+"""
+
+from argparse import ArgumentParser
+
+from gullian.source import Source
+from gullian.lexer import TableLexer
+from gullian.parser import Parser
+from gullian.checker import Module
+
+from . import gullian_sources
+from .common import add_repeat, best_of
+
+argparser = ArgumentParser('benchmarks.parser')
+add_repeat(argparser, 50)
+
+def parse_all(token_tuples: list):
+    for tokens in token_tuples:
+        tuple(Parser.new(tokens, Module.new('benchmark')).parse())
+
+def main():
+    arguments = argparser.parse_args()
+    paths = [path for path in gullian_sources() if '/std/' in path or '/examples/' in path]
+    token_tuples = [tuple(TableLexer(Source(open(path).read()), Module.new('benchmark')).lex()) for path in paths]
+    best, _ = best_of(arguments.repeat, parse_all, token_tuples)
+
+    print(f'{len(paths)} files, {sum(map(len, token_tuples))} tokens parsed in {best * 1000:.2f}ms')
+
+if __name__ == '__main__':
+    main()
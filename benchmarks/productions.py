@@ -0,0 +1,35 @@
+"""
+Profiles the productions of the parser over the std library, the examples and the self-hosted sources.
+
+    $ python -m benchmarks.productions [--limit N] [--json FILE]
+"""
+
+from argparse import ArgumentParser
+import os
+
+from gullian.checker import Module
+from gullian.compilation import Compilation
+from gullian.profiling import ParserProfile
+
+from . import ROOT, gullian_sources
+
+argparser = ArgumentParser('benchmarks.productions')
+argparser.add_argument('--limit', type=int, default=30, help='rows of the report')
+argparser.add_argument('--json', type=str, help='file the profile is written to')
+
+def main():
+    arguments = argparser.parse_args()
+    compilation = Compilation(cache=False, profile=ParserProfile())
+
+    for path in gullian_sources():
+        with open(path) as file:
+            compilation.parse(file.read(), Module.new(os.path.relpath(path, ROOT), compilation))
+
+    print(compilation.profile.report(arguments.limit))
+
+    if arguments.json:
+        with open(arguments.json, 'w') as file:
+            compilation.profile.dump(file)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Applies random edits to a large source and lexes it again after each one, both from scratch and
+incrementally from the previous TokenBuffer. Every incremental result is checked against the full one.
+
+    $ python -m benchmarks.relex [--copies N] [--edits N] [--seed N]
+"""
+
+from argparse import ArgumentParser
+import random
+import time
+
+from gullian.source import Source
+from gullian.lexer import TableLexer
+from gullian.checker import Module
+from gullian.incremental import Edit, relex
+
+from . import gullian_sources
+
+SNIPPETS = ('', ' ', '\n', 'a', '_x1', '0', '1.5', '"', '#', '"text"', '# comment\n', '.', '=', '==', '->', 'if', 'fun f() {}\n', '{', '}')
+
+argparser = ArgumentParser('benchmarks.relex')
+argparser.add_argument('--copies', type=int, default=20, help='how many times the repository sources are repeated')
+argparser.add_argument('--edits', type=int, default=200, help='how many edits are applied')
+argparser.add_argument('--seed', type=int, default=0)
+
+def columns(buffer):
+    return tuple(buffer.codes), tuple(map(buffer.position, range(len(buffer))))
+
+def random_edit(text: str):
+    start = random.randrange(len(text))
+    end = min(len(text), start + random.choice((0, 0, 1, 2, 8)))
+
+    return Edit(start, end, random.choice(SNIPPETS))
+
+def main():
+    arguments = argparser.parse_args()
+    random.seed(arguments.seed)
+
+    module = Module.new('benchmark')
+    file_string = '\n'.join(open(path).read() for path in gullian_sources() if '/std/' in path) * arguments.copies
+    buffer = TableLexer(Source(file_string), module).lex_buffer()
+    full_time = relex_time = 0
+    applied = 0
+
+    print(f'{len(file_string)} chars of source, {len(buffer)} tokens')
+
+    for _ in range(arguments.edits):
+        edit = random_edit(buffer.text)
+        text = buffer.text[:edit.start] + edit.text + buffer.text[edit.end:]
+
+        try:
+            start = time.perf_counter()
+            full = TableLexer(Source(text), module).lex_buffer()
+            full_time += time.perf_counter() - start
+        except SyntaxError:
+            # The edit produced an invalid token, which the incremental lexer must report as well
+            try:
+                relex(buffer, edit, module)
+            except SyntaxError:
+                continue
+
+            raise AssertionError(f'relex accepted {edit} but the full lexer rejected it')
+
+        start = time.perf_counter()
+        relexed = relex(buffer, edit, module)
+        relex_time += time.perf_counter() - start
+
+        assert columns(relexed) == columns(full), f'relex differs from the full lexer after {edit}'
+
+        buffer = relexed
+        applied += 1
+
+    print(f'{applied} edits applied, full lex {full_time / applied * 1000:.3f}ms/edit, relex {relex_time / applied * 1000:.3f}ms/edit')
+
+if __name__ == '__main__':
+    main()
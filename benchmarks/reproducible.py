@@ -0,0 +1,57 @@
+"""
+Compiles every example in new processes, each with another hash seed, without the cache, with an empty cache and
+with the interfaces the earlier runs saved, then checks that every run generated the same C.
+
+    $ python -m benchmarks.reproducible [--runs N]
+"""
+
+from argparse import ArgumentParser
+import subprocess
+import tempfile
+import hashlib
+import glob
+import sys
+import os
+
+from . import ROOT
+
+argparser = ArgumentParser('benchmarks.reproducible')
+argparser.add_argument('--runs', type=int, default=2, help='compiles of each example with every cache setting')
+
+def compile_(infile: str, outfile: str, hash_seed: int, cache_directory: str | None) -> bytes:
+    environment = dict(os.environ, PYTHONHASHSEED=str(hash_seed), GULLIAN_HOME=ROOT)
+    flags = ['--no-cache'] if cache_directory is None else ['--cache-directory', cache_directory]
+
+    subprocess.run([sys.executable, os.path.join(ROOT, 'gullian.py'), os.path.join(ROOT, infile), outfile, *flags], env=environment, cwd=ROOT, check=True, capture_output=True)
+
+    with open(outfile, 'rb') as file:
+        return file.read()
+
+def main():
+    arguments = argparser.parse_args()
+    different = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for infile in sorted(glob.glob('examples/*.gullian', root_dir=ROOT)):
+            outfile = os.path.join(directory, 'out.c')
+            cache_directory = tempfile.mkdtemp(dir=directory)
+            outputs = []
+
+            try:
+                for run in range(arguments.runs):
+                    outputs.append(compile_(infile, outfile, run, None))
+                    outputs.append(compile_(infile, outfile, run, cache_directory))
+            except subprocess.CalledProcessError:
+                print(f'{infile}: not compiled')
+                continue
+
+            digests = {hashlib.sha256(output).hexdigest()[:12] for output in outputs}
+            print(f'{infile}: {len(outputs)} runs, {len(digests)} different outputs')
+
+            if len(digests) > 1:
+                different.append(infile)
+
+    assert not different, f'runs generated different C for {", ".join(different)}'
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Times checking functions with many locals and deeply nested ifs, each if declaring a local of its own and reading
+the ones around it.
+
+    $ python -m benchmarks.scopes [--locals N [N ...]] [--depth N [N ...]] [--functions N] [--repeat N]
+
+Entering a scope doesn't copy the locals around it, so the time of a function should grow with its locals and
+its ifs added up, not multiplied.
+"""
+
+from argparse import ArgumentParser
+import time
+
+from gullian.checker import Checker, Module
+from gullian.compilation import Compilation
+
+from .common import add_repeat, best_timed
+
+argparser = ArgumentParser('benchmarks.scopes')
+argparser.add_argument('--locals', type=int, nargs='+', default=[10, 500, 2000], help='locals declared before the ifs')
+argparser.add_argument('--depth', type=int, nargs='+', default=[10, 100, 200], help='ifs nested in each other')
+argparser.add_argument('--functions', type=int, default=2)
+add_repeat(argparser, 5)
+
+def generate_function(index: int, locals_: int, depth: int) -> str:
+    lines = [f'fun function{index}(a: int) : int {{']
+    lines.extend(f'    let local{local} = a + {local}' for local in range(locals_))
+
+    for level in range(depth):
+        indent = '    ' * (level + 1)
+        lines.append(f'{indent}if local{level % locals_} > {level} {{')
+        lines.append(f'{indent}    let nested{level} = local{(level * 7) % locals_} + {level}')
+
+    for level in reversed(range(depth)):
+        lines.append('    ' * (level + 1) + '}')
+
+    lines.extend(['    return a', '}', ''])
+
+    return '\n'.join(lines)
+
+def generate_program(locals_: int, depth: int, functions: int) -> str:
+    return '\n'.join(generate_function(index, locals_, depth) for index in range(functions)) + '\nfun main() : int {\n}\n'
+
+def check(program: str):
+    compilation = Compilation(cache=False)
+    module = Module.new('main', compilation)
+    asts = tuple(compilation.parse(program, module))
+
+    start = time.perf_counter()
+    checked = tuple(Checker(asts, module).check())
+
+    return time.perf_counter() - start, checked
+
+def main():
+    arguments = argparser.parse_args()
+
+    for locals_ in arguments.locals:
+        for depth in arguments.depth:
+            program = generate_program(locals_, depth, arguments.functions)
+            best, _ = best_timed(arguments.repeat, check, program)
+
+            print(f'{locals_:>5} locals, {depth:>4} nested ifs: checked in {best * 1000:.2f}ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Times checking programs with more and more calls of the same few instantiations of generic functions, and reports
+how many of them were found in the specialization cache.
+
+    $ python -m benchmarks.specializations [--instantiations N] [--calls N [N ...]] [--repeat N]
+
+Checking time should grow with the calls, but the misses, the instances copied and checked, should stay the same.
+"""
+
+from argparse import ArgumentParser
+import time
+
+from gullian.checker import Checker, Module
+from gullian.compilation import Compilation
+
+from .common import add_repeat, run_from_root, best_timed
+
+argparser = ArgumentParser('benchmarks.specializations')
+argparser.add_argument('--instantiations', type=int, default=4, help='structs each generic function is instantiated for')
+argparser.add_argument('--calls', type=int, nargs='+', default=[25, 50, 100, 200], help='functions calling the generic ones')
+add_repeat(argparser, 5)
+
+def generate_program(instantiations: int, calls: int) -> str:
+    lines = ['import std.vec', 'import std.err', '']
+
+    for index in range(instantiations):
+        lines.extend([f'struct Item{index} {{', '    value: int', '}', ''])
+
+    for index in range(calls):
+        item = f'Item{index % instantiations} {{ {index} }}'
+
+        lines.extend([
+            f'fun use{index}() : int {{',
+            f'    let items = vec.new({item})',
+            f'    items.push({item})',
+            f'    let result = err.ok[Item{index % instantiations}, str]({item})',
+            '}',
+            '',
+            # The same instance again, with type arguments inferred from the return type
+            f'fun make{index}() : err.Result[Item{index % instantiations}, str] {{',
+            f'    return err.ok({item})',
+            '}',
+            '',
+        ])
+
+    lines.extend(['fun main() : int {', '}'])
+
+    return '\n'.join(lines)
+
+def check(program: str):
+    compilation = Compilation(cache=False)
+    module = Module.new('main', compilation)
+
+    start = time.perf_counter()
+    tuple(Checker(compilation.parse(program, module), module).check())
+
+    return time.perf_counter() - start, compilation.specializations
+
+def main():
+    arguments = argparser.parse_args()
+    run_from_root()
+
+    for calls in arguments.calls:
+        program = generate_program(arguments.instantiations, calls)
+        best, specializations = best_timed(arguments.repeat, check, program)
+
+        print(f'{calls:>5} calls: checked in {best * 1000:.2f}ms, {best * 1e6 / calls:.1f}us a call, {specializations.misses} misses, {specializations.hits} hits')
+
+if __name__ == '__main__':
+    main()
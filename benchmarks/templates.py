@@ -0,0 +1,82 @@
+"""
+Compares copying the bodies of the generic functions of std.vec and std.err with copy.deepcopy and with
+template.instantiate, as checking does for each instance, then times checking a program instantiating them.
+
+    $ python -m benchmarks.templates [--instances N] [--repeat N]
+
+Memory is what the copies of one run keep alive, measured with tracemalloc.
+"""
+
+from argparse import ArgumentParser
+import tracemalloc
+import copy
+import time
+import os
+
+from gullian.parser import FunctionDeclaration
+from gullian.checker import Checker, Module
+from gullian.compilation import Compilation
+from gullian.template import instantiate
+
+from . import ROOT
+from .specializations import generate_program
+from .common import add_repeat, run_from_root, best_of, best_timed
+
+MODULES = ('std/vec.gullian', 'std/err.gullian')
+
+argparser = ArgumentParser('benchmarks.templates')
+argparser.add_argument('--instances', type=int, default=50, help='copies of every generic body in a run')
+add_repeat(argparser, 5)
+
+def generic_bodies() -> list:
+    compilation = Compilation(cache=False)
+    bodies = []
+
+    for path in MODULES:
+        module = Module.new(os.path.basename(path).removesuffix('.gullian'), compilation)
+        asts = compilation.parse(compilation.load(os.path.join(ROOT, path)), module)
+        bodies.extend(ast.body for ast in asts if type(ast) is FunctionDeclaration and ast.head.generic)
+
+    return bodies
+
+def copy_bodies(copy_body, bodies: list, instances: int) -> list:
+    return [copy_body(body) for _ in range(instances) for body in bodies]
+
+def measure(copy_body, bodies: list, instances: int, repeat: int):
+    best, copies = best_of(repeat, copy_bodies, copy_body, bodies, instances)
+    del copies
+
+    tracemalloc.start()
+    copies = copy_bodies(copy_body, bodies, instances)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, size
+
+def check(program: str):
+    compilation = Compilation(cache=False)
+    module = Module.new('main', compilation)
+
+    start = time.perf_counter()
+    tuple(Checker(compilation.parse(program, module), module).check())
+
+    return time.perf_counter() - start, compilation
+
+def main():
+    arguments = argparser.parse_args()
+    run_from_root()
+
+    bodies = generic_bodies()
+    print(f'{len(bodies)} generic bodies, {arguments.instances} instances of each')
+
+    for label, copy_body in (('deepcopy', copy.deepcopy), ('instantiate', instantiate)):
+        seconds, size = measure(copy_body, bodies, arguments.instances, arguments.repeat)
+        print(f'{label:>12}: copied in {seconds * 1000:.2f}ms, {size / 1024:.0f}KiB kept')
+
+    program = generate_program(4, 100)
+    best, compilation = best_timed(arguments.repeat, check, program)
+
+    print(f'{compilation.specializations.misses} instances of std.vec and std.err checked in {best * 1000:.2f}ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Compares the memory held by the token stream of a large source when stored as a tuple of token
+objects and as a TokenBuffer, and the time the parser takes to consume each of them. Then compares
+the peak memory of lexing and parsing with every token storage of Compilation, streaming included.
+
+    $ python -m benchmarks.tokens [--copies N]
+"""
+
+from argparse import ArgumentParser
+import tracemalloc
+import time
+
+from gullian.source import Source
+from gullian.lexer import TableLexer
+from gullian.parser import Parser
+from gullian.checker import Module
+from gullian.compilation import Compilation, TOKEN_STORAGES
+
+from . import gullian_sources
+
+argparser = ArgumentParser('benchmarks.tokens')
+argparser.add_argument('--copies', type=int, default=20, help='how many times the repository sources are repeated')
+
+def measure_memory(build):
+    tracemalloc.start()
+    tokens = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return tokens, current, peak
+
+def measure_parse(tokens):
+    start = time.perf_counter()
+    asts = tuple(Parser.new(tokens, Module.new('benchmark')).parse())
+
+    return asts, time.perf_counter() - start
+
+def main():
+    arguments = argparser.parse_args()
+    file_string = '\n'.join(open(path).read() for path in gullian_sources() if '/std/' in path) * arguments.copies
+
+    storages = {
+        'tuple': lambda: tuple(TableLexer(Source(file_string), Module.new('benchmark')).lex()),
+        'buffer': lambda: TableLexer(Source(file_string), Module.new('benchmark')).lex_buffer(),
+    }
+
+    print(f'{len(file_string)} chars of source')
+
+    for storage, build in storages.items():
+        tokens, current, peak = measure_memory(build)
+        asts, parse_time = measure_parse(tokens)
+
+        print(f'{storage:>8}: {len(tokens)} tokens, {current / 2**20:8.2f} MiB held ({current / len(tokens):6.1f} B/token), {peak / 2**20:8.2f} MiB peak, parsed in {parse_time:.3f}s')
+
+    for storage in TOKEN_STORAGES:
+        compilation = Compilation(tokens=storage)
+        start = time.perf_counter()
+        asts, current, peak = measure_memory(lambda: compilation.parse(file_string, Module.new('benchmark', compilation)))
+
+        print(f'{storage:>8}: lexed and parsed in {time.perf_counter() - start:.3f}s, {peak / 2**20:8.2f} MiB peak')
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,39 @@
 #!/usr/bin/python
 
 from argparse import ArgumentParser
+import json
 
-from gullian.source import Source
-from gullian.lexer import Lexer
-from gullian.parser import Parser
+from gullian.lexer import LEXERS
 from gullian.checker import Checker, Module
+from gullian.compilation import Compilation, TOKEN_STORAGES, CACHE_DIRECTORY
+from gullian.profiling import ParserProfile
+from gullian.resolver import Resolver
 from gullian.codegen.cgen import CGen
 
 argparser = ArgumentParser('gullian')
 argparser.add_argument('infile', type=str)
 argparser.add_argument('outfile', type=str)
+argparser.add_argument('-I', dest='include', action='append', default=[], help='directory searched for imported modules, after the working directory')
+argparser.add_argument('--resolution-map', type=str, help='file the path of every imported module is written to as JSON')
+argparser.add_argument('--lexer', choices=tuple(LEXERS), default='table', help='lexer engine used for every module of the compilation')
+argparser.add_argument('--tokens', choices=TOKEN_STORAGES, default='tuple', help='storage of the token stream handed to the parser')
+argparser.add_argument('--no-mmap', dest='mapped', action='store_false', help='read source files into memory instead of mapping them')
+argparser.add_argument('--no-cache', dest='cache', action='store_false', help='lex and parse every imported module instead of loading them from the cache')
+argparser.add_argument('--cache-directory', type=str, default=CACHE_DIRECTORY, help='directory the parsed modules and checked interfaces are kept in')
+argparser.add_argument('--clear-cache', action='store_true', help='remove the cache of parsed modules before compiling')
+argparser.add_argument('--lazy-bodies', action='store_true', help='parse the body of a function only when the checker first reads it')
+argparser.add_argument('--lex-jobs', type=int, default=1, help='worker processes lexing chunks of large source files')
+argparser.add_argument('--parse-jobs', type=int, default=1, help='worker processes parsing the imported modules before checking')
+argparser.add_argument('--profile-parser', action='store_true', help='print the calls and time of every production of the parser, by module. Turns the cache and --parse-jobs off')
+argparser.add_argument('--profile-parser-json', type=str, help='file the profile of the parser is written to as JSON')
 
-def compile_file(infile: str, outfile: str):
-    file_string = open(infile).read()
-    module = Module.new()
+def compile_file(infile: str, outfile: str, compilation: Compilation=None):
+    module = Module.new(compilation=compilation)
+    file_string = module.compilation.load(infile)
 
-    tokens = tuple(Lexer(Source(file_string), module).lex())
-    asts = tuple(Parser(Source(tokens), module).parse())
+    module.compilation.parse_imports(file_string)
+
+    asts = module.compilation.parse(file_string, module)
     checker = Checker(asts, module)
 
     for checked in checker.check():
@@ -36,8 +52,35 @@ def compile_file(infile: str, outfile: str):
 def main():
     arguments = argparser.parse_args()
 
+    if not hasattr(LEXERS[arguments.lexer], 'lex_buffer') and (arguments.tokens == 'buffer' or arguments.lex_jobs > 1):
+        argparser.error(f"the {arguments.lexer} lexer can't fill a token buffer, as --tokens buffer and --lex-jobs need")
+
     if arguments.infile:
-        return compile_file(arguments.infile, arguments.outfile)
+        compilation = Compilation(lexer=arguments.lexer, tokens=arguments.tokens, mapped=arguments.mapped, lex_jobs=arguments.lex_jobs, cache=arguments.cache, cache_directory=arguments.cache_directory, lazy_bodies=arguments.lazy_bodies, parse_jobs=arguments.parse_jobs, resolver=Resolver.new(arguments.include))
+
+        if arguments.profile_parser or arguments.profile_parser_json:
+            # Modules loaded from the cache or parsed by workers would be missing from the profile
+            compilation.profile = ParserProfile()
+            compilation.cache = False
+            compilation.parse_jobs = 1
+
+        if arguments.clear_cache:
+            compilation.clear_cache()
+
+        compile_file(arguments.infile, arguments.outfile, compilation)
+
+        if arguments.profile_parser:
+            print(compilation.profile.report())
+
+        if arguments.profile_parser_json:
+            with open(arguments.profile_parser_json, 'w') as file:
+                compilation.profile.dump(file)
+
+        if arguments.resolution_map:
+            with open(arguments.resolution_map, 'w') as file:
+                json.dump(compilation.resolver.resolution_map(), file, indent=4)
+
+        return
 
     return argparser.print_usage()
 
@@ -1,9 +1,19 @@
+__version__ = '0.1.0'
+
 from . import source
 from . import lexer
 from . import parser
 from . import type
 from . import checker
 from . import interpreter
+from . import compilation
+from . import incremental
+from . import arena
+from . import parallel
+from . import profiling
+from . import resolver
+from . import interface
+from . import template
 
 __all__ = [
     source,
@@ -11,5 +21,13 @@ __all__ = [
     parser,
     type,
     checker,
-    interpreter
+    interpreter,
+    compilation,
+    incremental,
+    arena,
+    parallel,
+    profiling,
+    resolver,
+    interface,
+    template,
 ]
\ No newline at end of file
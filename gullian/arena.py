@@ -0,0 +1,243 @@
+from typing import TYPE_CHECKING
+from dataclasses import dataclass, fields
+from array import array
+import marshal
+
+from .lexer import Span, Name, Literal, Token, Keyword, Comment, TokenKind, KeywordKind
+from .parser import Ast, LazyBody, Body, FunctionHead, StructDeclaration, UnionDeclaration, Extern, Import, EnumDeclaration, FunctionDeclaration, VariableDeclaration, If, While, For, Return, Comptime, Switch, Call, StructLiteral, UnaryOperator, TestGuard, BinaryOperator, Subscript, Attribute, Assignment
+
+if TYPE_CHECKING:
+    from .checker import Module
+
+class ModuleReference:
+    """Stands for FunctionHead.module in an arena, it is bound to the module the arena is loaded into"""
+
+MODULE_REFERENCE = ModuleReference()
+
+# Bodies that were never parsed are leaves, kept as the span of their source
+LEAF_KINDS = (type(None), ModuleReference, Name, Literal, Token, Keyword, Comment, LazyBody)
+CONTAINER_KINDS = (list, tuple, dict)
+NODE_KINDS = (Body, FunctionHead, StructDeclaration, UnionDeclaration, Extern, Import, EnumDeclaration, FunctionDeclaration, VariableDeclaration, If, While, For, Return, Comptime, Switch, Call, StructLiteral, UnaryOperator, TestGuard, BinaryOperator, Subscript, Attribute, Assignment)
+
+ARENA_KINDS = LEAF_KINDS + CONTAINER_KINDS + NODE_KINDS
+ARENA_KIND_CODES = {kind: code for code, kind in enumerate(ARENA_KINDS)}
+NODE_FIELDS = {kind: tuple(field.name for field in fields(kind)) for kind in NODE_KINDS}
+
+ARENA_FORMAT = 2
+
+@dataclass
+class AstArena:
+    """
+    ASTs stored as parallel arrays, a node is an integer handle into them. Nodes are appended in post-order, so the
+    subtree of a handle is the contiguous range of handles from subtree_starts[handle] to the handle itself and the
+    children of a node come before it. Leaves keep their payload in values, their source span in starts and ends
+    """
+
+    text: str | bytes
+    kinds: array
+    lines: array
+    starts: array
+    ends: array
+    first_children: array
+    child_counts: array
+    subtree_starts: array
+    children: array
+    values: list
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def kind(self, handle: int) -> type:
+        return ARENA_KINDS[self.kinds[handle]]
+
+    def child_handles(self, handle: int) -> array:
+        first = self.first_children[handle]
+
+        return self.children[first: first + self.child_counts[handle]]
+
+    def value(self, handle: int):
+        return self.values[handle]
+
+    def line(self, handle: int) -> int:
+        return self.lines[handle]
+
+    def span(self, handle: int) -> Span | None:
+        if self.starts[handle] < 0:
+            return None
+
+        return Span(self.text, self.starts[handle], self.ends[handle])
+
+    def walk(self, handle: int) -> range:
+        """Every handle of the subtree in post-order, children before their parents"""
+
+        return range(self.subtree_starts[handle], handle + 1)
+
+    def append(self, kind: type, value=None, line: int=-1, span: Span=None, children: list[int]=()) -> int:
+        handle = len(self.kinds)
+
+        self.kinds.append(ARENA_KIND_CODES[kind])
+        self.lines.append(line)
+        self.starts.append(-1 if span is None else span.start)
+        self.ends.append(-1 if span is None else span.end)
+        self.first_children.append(len(self.children))
+        self.child_counts.append(len(children))
+        self.subtree_starts.append(self.subtree_starts[children[0]] if children else handle)
+        self.children.extend(children)
+        self.values.append(value)
+
+        return handle
+
+    def store_leaf(self, leaf) -> int:
+        kind = type(leaf)
+
+        if kind is Name:
+            return self.append(Name, leaf.value, leaf.line, leaf.span)
+        elif kind is Token or kind is Keyword:
+            return self.append(kind, leaf.kind, leaf.line, leaf.span)
+        elif kind is Literal or kind is Comment:
+            return self.append(kind, leaf.value, leaf.line, leaf.span)
+        elif kind is LazyBody:
+            return self.append(LazyBody, None, leaf.brace_line, leaf.span)
+
+        return self.append(kind)
+
+    def store(self, ast: Ast) -> int:
+        """Appends ast and returns its handle. The tree is walked with an explicit stack, deep expressions don't recurse"""
+
+        stack = [(ast, None)]
+        handles = []
+
+        while stack:
+            node, child_count = stack.pop()
+
+            if child_count is not None:
+                children = handles[len(handles) - child_count:]
+                del handles[len(handles) - child_count:]
+
+                handles.append(self.append(type(node), children=children))
+                continue
+
+            if type(node) is LazyBody and node.body is not None:
+                node = node.body
+
+            kind = type(node)
+
+            if kind in NODE_FIELDS:
+                items = [MODULE_REFERENCE if name == 'module' else getattr(node, name) for name in NODE_FIELDS[kind]]
+            elif kind is list or kind is tuple:
+                items = node
+            elif kind is dict:
+                items = [item for pair in node.items() for item in pair]
+            elif kind in ARENA_KIND_CODES:
+                handles.append(self.store_leaf(node))
+                continue
+            else:
+                raise TypeError(f"can't store {kind.__name__} in an AstArena, only parsed ASTs can be stored")
+
+            stack.append((node, len(items)))
+            stack.extend((item, None) for item in reversed(items))
+
+        return handles[0]
+
+    def load(self, handle: int, module: "Module") -> Ast:
+        """Builds the dataclasses of a subtree again, names are interned in the compilation of module"""
+
+        symbols = module.compilation.symbols
+        start = self.subtree_starts[handle]
+        built = []
+
+        for current in range(start, handle + 1):
+            kind = ARENA_KINDS[self.kinds[current]]
+
+            if kind is Name:
+                node = symbols.name(self.values[current], self.lines[current], self.span(current))
+            elif kind is Token or kind is Keyword or kind is Literal or kind is Comment:
+                node = kind(self.values[current], self.lines[current], self.span(current))
+            elif kind is LazyBody:
+                node = LazyBody.from_source(self.span(current), self.lines[current], module)
+            elif kind is ModuleReference:
+                node = module
+            elif kind is type(None):
+                node = None
+            else:
+                first = self.first_children[current]
+                items = [built[child - start] for child in self.children[first: first + self.child_counts[current]]]
+
+                if kind is list or kind is tuple:
+                    node = kind(items)
+                elif kind is dict:
+                    node = dict(zip(items[::2], items[1::2]))
+                else:
+                    node = kind(*items)
+
+            built.append(node)
+
+        return built[-1]
+
+    def clone(self, handle: int) -> int:
+        """Copies a subtree at the end of the arena, only array slices are copied and shifted"""
+
+        start = self.subtree_starts[handle]
+        first_child = self.first_children[start]
+        shift = len(self.kinds) - start
+        child_shift = len(self.children) - first_child
+
+        self.kinds.extend(self.kinds[start: handle + 1])
+        self.lines.extend(self.lines[start: handle + 1])
+        self.starts.extend(self.starts[start: handle + 1])
+        self.ends.extend(self.ends[start: handle + 1])
+        self.child_counts.extend(self.child_counts[start: handle + 1])
+        self.values.extend(self.values[start: handle + 1])
+        self.first_children.extend(first + child_shift for first in self.first_children[start: handle + 1])
+        self.subtree_starts.extend(subtree_start + shift for subtree_start in self.subtree_starts[start: handle + 1])
+        self.children.extend(child + shift for child in self.children[first_child: self.first_children[handle] + self.child_counts[handle]])
+
+        return handle + shift
+
+    def dumps(self) -> bytes:
+        # Kinds of tokens and keywords are enums, they are saved by value
+        values = [value.value if type(value) is TokenKind or type(value) is KeywordKind else value for value in self.values]
+        columns = (self.kinds, self.lines, self.starts, self.ends, self.first_children, self.child_counts, self.subtree_starts, self.children)
+
+        return marshal.dumps((ARENA_FORMAT, self.text if type(self.text) is str else bytes(self.text), tuple(column.tobytes() for column in columns), values))
+
+    @classmethod
+    def loads(cls, data: bytes):
+        format_, text, columns, values = marshal.loads(data)
+
+        if format_ != ARENA_FORMAT:
+            raise ValueError(f'unsupported AstArena format {format_}, expected {ARENA_FORMAT}')
+
+        arena = cls.new(text)
+
+        for column, data in zip((arena.kinds, arena.lines, arena.starts, arena.ends, arena.first_children, arena.child_counts, arena.subtree_starts, arena.children), columns):
+            column.frombytes(data)
+
+        for handle, value in enumerate(values):
+            kind = ARENA_KINDS[arena.kinds[handle]]
+
+            if kind is Token:
+                value = TokenKind(value)
+            elif kind is Keyword:
+                value = KeywordKind(value)
+
+            arena.values.append(value)
+
+        return arena
+
+    @classmethod
+    def new(cls, text: str | bytes=''):
+        return cls(text, array('B'), array('i'), array('i'), array('i'), array('I'), array('I'), array('I'), array('I'), list())
+
+class ArenaVisitor:
+    """Dispatches every handle to a visit_<Kind> method, kinds without one have their children visited"""
+
+    def __init__(self, arena: AstArena):
+        self.arena = arena
+
+    def visit(self, handle: int):
+        return getattr(self, f'visit_{self.arena.kind(handle).__name__}', self.generic_visit)(handle)
+
+    def generic_visit(self, handle: int):
+        for child in self.arena.child_handles(handle):
+            self.visit(child)
@@ -1,24 +1,63 @@
 from dataclasses import dataclass
 import os
-import copy
 
 
 from .type import *
 
-from .source import Source
-from .lexer import Lexer, Name, Literal, Token, TokenKind, Comment, Keyword, KeywordKind
+from .lexer import Name, Literal, Token, TokenKind, Comment, Keyword, KeywordKind
 from .parser import Ast, TypeDeclaration, Expression
-from .parser import Parser, FunctionDeclaration, FunctionHead, Extern, Import, EnumDeclaration, StructDeclaration, UnionDeclaration, VariableDeclaration, Assignment, Body, While, For, If, Return, Comptime, Switch, Call, Attribute, Subscript, StructLiteral, UnaryOperator, BinaryOperator, TestGuard
+from .parser import FunctionDeclaration, FunctionHead, Extern, Import, EnumDeclaration, StructDeclaration, UnionDeclaration, VariableDeclaration, Assignment, Body, While, For, If, Return, Comptime, Switch, Call, Attribute, Subscript, StructLiteral, UnaryOperator, BinaryOperator, TestGuard
 from .interpreter import Interpreter
+from .compilation import Compilation
+from .interface import INTERFACE_ERRORS
+from .template import instantiate
 
 from .type import *
 
+MISSING = object()
+
+class ScopedDict(dict):
+    """Dictionary logging what each write replaced, so it can be restored to how it was at a mark"""
+
+    __slots__ = ('log',)
+
+    def __init__(self):
+        super().__init__()
+        self.log = []
+
+    def __setitem__(self, key, value):
+        self.log.append((key, self.get(key, MISSING)))
+        super().__setitem__(key, value)
+
+    def __reduce__(self):
+        # The log only matters while a child scope is entered, it is never saved
+        return ScopedDict, (), None, None, iter(self.items())
+
+    def mark(self) -> int:
+        return len(self.log)
+
+    def restore(self, mark: int):
+        while len(self.log) > mark:
+            key, value = self.log.pop()
+
+            if value is MISSING:
+                super().__delitem__(key)
+            else:
+                super().__setitem__(key, value)
+
 @dataclass
 class Scope:
+    """
+    Names visible in a function or an if. Child scopes share the dictionaries of their parent, entering one only
+    marks their logs and leaving it undoes what was declared in it
+    """
+
     module: "Module"
-    variables: dict[Name, VariableDeclaration | FunctionArgument]
-    type_variables: dict[Name, Type]
-    type_guards: list[Attribute]
+    variables: "ScopedDict[Name, VariableDeclaration | FunctionArgument]"
+    type_variables: "ScopedDict[Name, Type]"
+    type_guards: tuple[Attribute, ...]
+    parent: "Scope"=None
+    marks: tuple[int, int]=None
 
     def get_variable(self, name: Name) -> VariableDeclaration | FunctionArgument:
         if type(name) is not Name:
@@ -38,12 +77,20 @@ class Scope:
 
         raise NameError(f'type variable {name.value} not found in current scope. at line {name.line} in module {self.module.name}')
 
-    def copy(self):
-        return type(self)(self.module, dict(self.variables), dict(self.type_variables), list(self.type_guards))
+    def child(self):
+        return type(self)(self.module, self.variables, self.type_variables, self.type_guards, self, (self.variables.mark(), self.type_variables.mark()))
+
+    def leave(self) -> "Scope":
+        """Forgets what was declared since the scope was entered and returns its parent"""
+
+        self.variables.restore(self.marks[0])
+        self.type_variables.restore(self.marks[1])
+
+        return self.parent
 
     @classmethod
     def new(cls, module: "Module"):
-        return cls(module, dict(), dict(), list())
+        return cls(module, ScopedDict(), ScopedDict(), tuple())
     
 @dataclass
 class Module:
@@ -53,6 +100,7 @@ class Module:
     imports: dict[Name, "Module"]
     scope: Scope
     includes: list[str]
+    compilation: Compilation=None
     
     def import_type(self, name: Name | UnaryOperator):
         # FIXME: weird hack
@@ -100,6 +148,11 @@ class Module:
                 if not type_.declaration.generic:
                     raise TypeError(f"type {type_.name} is not a generic type. at line {name.line}. in module {self.name}")
                 
+                key = 'generic', type_.key, tuple(type_key(item) for item in name_typed.items)
+
+                if (interned := self.compilation.types.get(key)) is not None:
+                    return interned
+
                 struct_declaration: StructDeclaration = type_.declaration
 
                 def apply_generic(field_type: Type):
@@ -121,7 +174,7 @@ class Module:
                 else:
                     new_type_declaration = UnionDeclaration(name, [(field_name, apply_generic(field_type)) for field_name, field_type in struct_declaration.fields], list())
 
-                generated_type = Type(name_typed, Type.gen_uid(), dict(), new_type_declaration, self)
+                generated_type = self.compilation.types.intern(Type(name_typed, 0, dict(), new_type_declaration, self), key)
                 generated_type.associated_functions = {name: AssociatedFunction(generated_type, function) for name, function in type_.associated_functions.items()}
 
                 # self.types[name] = generated_type
@@ -169,7 +222,7 @@ class Module:
                     pass
 
                 if type_ is not None:
-                    return self.import_function(Attribute(type_, Name('call', name.line)))
+                    return self.import_function(Attribute(type_, self.compilation.symbols.name('call', name.line)))
 
                 raise NameError(f'{name} is not a function of module {self.name}. at line {name.line}')
             
@@ -247,9 +300,6 @@ class Module:
         
         # Creates a new function based in its generic form or return the already created specialized version
         elif type(name) is Subscript:
-            if name in self.functions:
-                return self.functions[name]
-            
             function: FunctionDeclaration = self.import_function(name.head)
 
             if not function.head.generic:
@@ -258,6 +308,19 @@ class Module:
 
                 raise TypeError(f"function {function.head.name.format} is not a generic function, got {name.format}. at line {name.line}. in module {self.name}")
             
+            # Type arguments are resolved where they are written, before the scope of the generic function is entered
+            parametric_types = tuple(self.import_type(item) for item in name.items)
+            template = function.value if type(function) is Typed else function
+            owner = template.owner if type(template) is AssociatedFunction else None
+            key = id(template.declaration if owner is not None else template), type_key(owner) if owner is not None else None, tuple(type_key(parametric_type) for parametric_type in parametric_types)
+
+            if (specialization := self.compilation.specializations.get(key)) is not None:
+                return specialization
+
+            # Instances loaded with the interface of the module
+            if name in self.functions:
+                return self.compilation.specializations.store(key, self.functions[name])
+
             def apply_generic(field_type: Type):
                 if type(field_type) is Subscript:
                     return Subscript(field_type.head, tuple(apply_generic(item) for item in field_type.items))
@@ -267,28 +330,20 @@ class Module:
                 
                 return field_type
 
-            old_scope = function.head.module.scope
-            function.head.module.scope = old_scope.copy()
+            function.head.module.scope = function.head.module.scope.child()
 
 
             temporary_checker = Checker(tuple(), function.head.module)
             new_function_head = FunctionHead(name, [(argument_name, apply_generic(argument_type)) for argument_name, argument_type in function.head.arguments], apply_generic(function.head.return_hint), list(), function.head.module)
 
             # Make type aliases for check_body()
-            for type_alias, parametric_type in zip(function.head.generic, name.items):
-                if type(parametric_type) is Type:
-                    function.head.module.scope.type_variables[type_alias] = parametric_type
-                    continue
-                elif type(parametric_type) is Typed and parametric_type.type_ is TYPE:
-                    function.head.module.scope.type_variables[type_alias] = parametric_type.value
-                    continue
-
-                function.head.module.scope.type_variables[type_alias] = self.import_type(parametric_type)
+            for type_alias, parametric_type in zip(function.head.generic, parametric_types):
+                function.head.module.scope.type_variables[type_alias] = parametric_type
             
             for argument_name, argument_type in new_function_head.arguments:
                 function.head.module.scope.variables[argument_name] = FunctionArgument(argument_name, argument_type)
             
-            new_function = FunctionDeclaration(new_function_head, copy.deepcopy(function.body))
+            new_function = FunctionDeclaration(new_function_head, instantiate(function.body))
             
             # This is important to check_call() for methods to work properly
             if type(function) is AssociatedFunction:
@@ -299,9 +354,9 @@ class Module:
             
             new_function = temporary_checker.check_function_declaration(new_function)
 
-            function.head.module.scope = old_scope
+            function.head.module.scope = function.head.module.scope.leave()
 
-            return new_function
+            return self.compilation.specializations.store(key, new_function)
         
         raise TypeError(f"argument 'name' must be a Name or Attribute, found {type(name)}")
     
@@ -315,8 +370,8 @@ class Module:
         return self.import_type(name)
 
     @classmethod
-    def new(cls, name='main'):
-        module = cls(name, dict(), dict(), dict(), None, list())
+    def new(cls, name='main', compilation: Compilation=None):
+        module = cls(name, dict(), dict(), dict(), None, list(), compilation or Compilation())
         module.scope = Scope.new(module)
 
         return module
@@ -412,9 +467,9 @@ class Checker:
                 self_argument = dict(function.head.arguments)['self']
 
                 if type(self_argument) is Subscript and self_argument.head == PTR.name:
-                    arguments.insert(0, Type.new(Subscript(PTR, (function.owner,)), PTR.declaration, PTR.module))
+                    arguments.insert(0, Type(Subscript(PTR, (function.owner,)), PTR.uid, dict(), PTR.declaration))
                 elif type(self_argument) is UnaryOperator and self_argument.operator.kind is TokenKind.Ampersand:
-                    arguments.insert(0, Type.new(Subscript(PTR, (function.owner,)), PTR.declaration, PTR.module))
+                    arguments.insert(0, Type(Subscript(PTR, (function.owner,)), PTR.uid, dict(), PTR.declaration))
                 else:
                     arguments.insert(0, function.owner)
             
@@ -820,8 +875,7 @@ class Checker:
     
     # NOTE: work here ...
     def check_function_declaration(self, function_declaration: FunctionDeclaration):
-        old_scope = self.module.scope
-        self.module.scope = old_scope.copy()
+        self.module.scope = self.module.scope.child()
 
         generic = function_declaration.head.generic
 
@@ -855,18 +909,17 @@ class Checker:
         
             function_declaration.body = self.check_body(function_declaration.body, function_declaration.head.return_hint)
 
-        self.module.scope = old_scope
+        self.module.scope = self.module.scope.leave()
 
         return Typed(function_declaration, type_=FUNCTION)
     
     def check_if(self, if_: If, return_type: Type):
-        old_scope = self.module.scope
-        self.module.scope = old_scope.copy()
+        self.module.scope = self.module.scope.child()
 
         if_.condition = self.check_expression(if_.condition)
 
         if type(if_.condition.value) is TestGuard:
-            self.module.scope.type_guards.append(Attribute(if_.condition.value.expression.value.left.type_, if_.condition.value.expression.value.right))
+            self.module.scope.type_guards += (Attribute(if_.condition.value.expression.value.left.type_, if_.condition.value.expression.value.right),)
 
         if_.true_body = self.check_body(if_.true_body, return_type)
 
@@ -876,7 +929,7 @@ class Checker:
             else:
                 if_.false_body = self.check_body(if_.false_body, return_type)
         
-        self.module.scope = old_scope
+        self.module.scope = self.module.scope.leave()
 
         return if_
     
@@ -887,7 +940,7 @@ class Checker:
         return while_
     
     def check_for(self, for_: For, return_type: Type):
-        head_iterator_name = Name(f'iter_{self.module.name}_{for_.line}', for_.line)
+        head_iterator_name = self.module.compilation.symbols.name(f'iter_{self.module.name}_{for_.line}', for_.line)
         head_target_name = for_.head_target
 
         for_.head_iterator = self.check_variable_declaration(VariableDeclaration(head_iterator_name, self.check_expression(for_.head_iterator)))
@@ -895,15 +948,15 @@ class Checker:
         type_: Type = for_.head_iterator.type_
         associated_functions_dict = dict(type_.associated_functions)
 
-        function_next = type_.import_any(Name('next', for_.line))
+        function_next = type_.import_any(self.module.compilation.symbols.name('next', for_.line))
 
         if function_next is None:
             raise AttributeError(f"type `{type_.name.format}` dot not provide a `fun next(...)` method. then its not iterable. at line {for_.line}, in module {self.module.name}")
         
-        for_.head_target = self.check_variable_declaration(VariableDeclaration(head_target_name, Call(Attribute(head_iterator_name, Name('next', for_.line)), list(), list())))
+        for_.head_target = self.check_variable_declaration(VariableDeclaration(head_target_name, Call(Attribute(head_iterator_name, self.module.compilation.symbols.name('next', for_.line)), list(), list())))
         
         # NOTE: Maybe bug prone?
-        for_.head_checker = self.check_test_guard(TestGuard(Attribute(head_target_name, Name('ok', for_.line))))
+        for_.head_checker = self.check_test_guard(TestGuard(Attribute(head_target_name, self.module.compilation.symbols.name('ok', for_.line))))
         for_.body = self.check_body(for_.body, return_type)
 
         return for_
@@ -920,48 +973,91 @@ class Checker:
         return Typed(extern, type_=FUNCTION)
     
     def check_import(self, import_: Import):
-        os_module_name = import_.module_name.format.replace('.', os.sep) + '.gullian'
-
-        if 'GULLIAN_HOME' in os.environ and not os.path.isfile(os_module_name):
-            os_module_name = os.path.join(os.environ['GULLIAN_HOME'], os_module_name)
+        os_module_name = self.module.compilation.resolver.resolve(import_.module_name.format)
 
-        if not os.path.isfile(os_module_name):
+        if os_module_name is None:
             if 'GULLIAN_HOME' in os.environ:
                 raise ImportError(f"can't import gullian module {import_.module_name.format}, file not found.")
         
             raise ImportError(f"can't import gullian module {import_.module_name.format}, file not found. Make sure GULLIAN_HOME is set")
         
 
-        module_name_formated = import_.module_name.format
+        compilation = self.module.compilation
+        path = os.path.realpath(os_module_name)
 
-        def recurse_check_import(module_name_formated: str, module: Module):
-            if module.name == module_name_formated:
-                return module
-            
-            for imported_module in module.imports.values():
-                if recycle_module := recurse_check_import(module_name_formated, imported_module):
-                    return recycle_module
-
-            return None
-        
-        if recycle_module := recurse_check_import(import_.module_name.format, self.module):
-            module = recycle_module
+        if path in compilation.modules:
+            module = compilation.modules[path]
+            compilation.interfaces.imported(path)
         else:
-            
-            file_string = open(os_module_name).read()
-            module = Module.new(import_.module_name.format)
-
-            tokens = tuple(Lexer(Source(file_string), module).lex())
-            asts = tuple(Parser(Source(tokens), module).parse())
-            checker = Checker(asts, module)
-
-            for _ in checker.check():
-                continue
+            module = self.check_module(import_.module_name.format, path)
 
         self.module.imports[import_.module_name.rightest] = module
 
         return import_
 
+    def check_module(self, module_name: str, path: str) -> Module:
+        """Checks the module at path, or loads the interface a previous compilation saved for it"""
+
+        compilation = self.module.compilation
+        module = Module.new(module_name, compilation)
+        file_string = compilation.load(path)
+
+        # Registered before it is checked, so that import cycles find it
+        compilation.modules[path] = module
+
+        if compilation.cache and self.load_interface(path, file_string):
+            return module
+
+        snapshot = compilation.interfaces.begin(compilation, path)
+        checker = Checker(compilation.parse_file(path, file_string, module), module)
+
+        for _ in checker.check():
+            continue
+
+        additions = compilation.interfaces.end(compilation, path, snapshot)
+
+        if compilation.cache:
+            compilation.write_interface(path, file_string, additions)
+
+        return module
+
+    def load_interface(self, path: str, file_string: str | bytes) -> bool:
+        compilation = self.module.compilation
+        interface = compilation.read_interface(path, file_string)
+
+        if interface is None:
+            return False
+
+        key, dependencies, state = interface
+        checkpoint = compilation.checkpoint()
+
+        for module_name, dependency_path, dependency_key, imported in dependencies:
+            if imported:
+                # The search path may find another file for the module than the one the interface was saved with
+                resolved = compilation.resolver.resolve(module_name)
+
+                if resolved is None or os.path.realpath(resolved) != dependency_path or dependency_path in compilation.interfaces.checking:
+                    break
+
+                # Errors in a dependency are errors of the program, checking this module from source raises them too
+                if dependency_path not in compilation.modules:
+                    self.check_module(module_name, dependency_path)
+
+            if compilation.interfaces.keys.get(dependency_path) != dependency_key:
+                break
+        else:
+            try:
+                compilation.interfaces.load(compilation, path, file_string, key, state)
+
+                return True
+            except INTERFACE_ERRORS:
+                pass
+
+        # A dependency changed or entries the interface refers to are missing, the module is checked from its source
+        compilation.rollback(checkpoint)
+
+        return False
+
     def check_enum_declaration(self, enum_declaration: EnumDeclaration):
         name = enum_declaration.name
         self.module.types[name] = Type.new(name, enum_declaration, self.module)
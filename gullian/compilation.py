@@ -0,0 +1,236 @@
+from typing import TYPE_CHECKING
+from dataclasses import dataclass, field
+import hashlib
+import pickle
+import shutil
+import os
+
+from . import __version__
+from .source import Source, map_file
+from .lexer import LEXERS, LEXERS_OF_BYTES, SymbolTable
+from .parser import Parser, Ast
+from .profiling import ParserProfile
+from .resolver import Resolver
+from .parallel import lex_parallel, parse_import_graph
+from .arena import AstArena, ARENA_FORMAT
+from .interface import Interfaces
+from .type import TypeTable, Specializations
+
+if TYPE_CHECKING:
+    from .checker import Module
+
+TOKEN_STORAGES = ('tuple', 'buffer', 'stream')
+
+def user_cache_directory() -> str:
+    """The cache of the current user, kept out of the working directory since loading an interface unpickles it"""
+
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'gullian')
+
+CACHE_DIRECTORY = user_cache_directory()
+
+def source_digest() -> str:
+    """Hash of the source files of the compiler, so that changing any of them leaves the cache of the old ones unread"""
+
+    package_directory = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+
+    for directory, directories, files in os.walk(package_directory):
+        directories[:] = sorted(name for name in directories if name != '__pycache__')
+
+        for file_name in sorted(files):
+            if file_name.endswith('.py'):
+                digest.update(os.path.relpath(os.path.join(directory, file_name), package_directory).encode())
+
+                with open(os.path.join(directory, file_name), 'rb') as file:
+                    digest.update(file.read())
+
+    return digest.hexdigest()[:16]
+
+CACHE_VERSION = f'{__version__}-{ARENA_FORMAT}-{source_digest()}'
+
+@dataclass
+class Compilation:
+    lexer: str='table'
+    tokens: str='tuple'
+    mapped: bool=True
+    lex_jobs: int=1
+    cache: bool=True
+    cache_directory: str=CACHE_DIRECTORY
+    lazy_bodies: bool=False
+    parse_jobs: int=1
+    profile: ParserProfile=None
+    resolver: Resolver=field(default_factory=Resolver.new, repr=False)
+    symbols: SymbolTable=field(default_factory=SymbolTable.new, repr=False)
+    parsed_modules: dict[str, bytes]=field(default_factory=dict, repr=False)
+    # Modules imported so far, by the real path of their files
+    modules: dict[str, "Module"]=field(default_factory=dict, repr=False)
+    interfaces: Interfaces=field(default_factory=Interfaces, repr=False)
+    types: TypeTable=field(default_factory=TypeTable.new, repr=False)
+    specializations: Specializations=field(default_factory=Specializations, repr=False)
+
+    def load(self, path: str):
+        if self.mapped and self.lexer in LEXERS_OF_BYTES:
+            return map_file(path)
+        
+        return open(path).read()
+
+    def lex(self, file_string: str, module: "Module"):
+        if self.lexer not in LEXERS:
+            raise ValueError(f"unknown lexer engine {self.lexer!r}, expected one of {', '.join(LEXERS)}")
+
+        return LEXERS[self.lexer](Source(file_string), module).lex()
+    
+    def lex_buffer(self, file_string: str, module: "Module"):
+        lexer = LEXERS[self.lexer](Source(file_string), module)
+
+        if not hasattr(lexer, 'lex_buffer'):
+            raise ValueError(f"lexer engine {self.lexer!r} can't fill a token buffer")
+        elif self.lex_jobs > 1:
+            return lex_parallel(file_string, module, workers=self.lex_jobs)
+        
+        return lexer.lex_buffer()
+    
+    def tokenize(self, file_string: str, module: "Module"):
+        if self.tokens == 'tuple':
+            if self.lex_jobs > 1:
+                return tuple(self.lex_buffer(file_string, module))
+
+            return tuple(self.lex(file_string, module))
+        elif self.tokens == 'buffer':
+            return self.lex_buffer(file_string, module)
+        elif self.tokens == 'stream':
+            # Tokens are lexed as the parser asks for them, instead of all at once before parsing
+            return self.lex(file_string, module)
+        
+        raise ValueError(f"unknown token storage {self.tokens!r}, expected one of {', '.join(TOKEN_STORAGES)}")
+
+    def parse(self, file_string: str, module: "Module") -> tuple[Ast]:
+        parser = Parser.new(self.tokenize(file_string, module), module, self.lazy_bodies)
+
+        if self.profile is not None:
+            self.profile.instrument(parser)
+
+        return tuple(parser.parse())
+
+    def cache_path(self, file_string: str | bytes, extension: str='ast', identity: str='') -> str:
+        digest = hashlib.sha256(CACHE_VERSION.encode())
+        digest.update(identity.encode())
+        digest.update(file_string.encode() if type(file_string) is str else file_string)
+
+        return os.path.join(self.cache_directory, f'{digest.hexdigest()}.{extension}')
+
+    def read_cache(self, path: str) -> AstArena | None:
+        try:
+            with open(path, 'rb') as file:
+                return AstArena.loads(file.read())
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+
+    def write_cache(self, path: str, data: bytes):
+        try:
+            os.makedirs(self.cache_directory, mode=0o700, exist_ok=True)
+
+            # Written aside and renamed, so that other compilations never read half of an entry
+            with open(f'{path}.{os.getpid()}', 'wb') as file:
+                file.write(data)
+
+            os.replace(f'{path}.{os.getpid()}', path)
+        except OSError:
+            pass
+
+    def parse_cached(self, file_string: str | bytes, module: "Module") -> tuple[Ast]:
+        """Like parse(), but the ASTs are kept in the cache directory, keyed by the hash of the source and the compiler version"""
+
+        if not self.cache:
+            return self.parse(file_string, module)
+
+        path = self.cache_path(file_string)
+        arena = self.read_cache(path)
+
+        if arena is None:
+            asts = self.parse(file_string, module)
+            arena = AstArena.new(file_string)
+            arena.store(list(asts))
+
+            self.write_cache(path, arena.dumps())
+
+            return asts
+
+        # The list of ASTs was the last node stored
+        return tuple(arena.load(len(arena) - 1, module))
+
+    def parse_arena(self, file_string: str | bytes, module: "Module") -> AstArena:
+        """The ASTs of file_string stored in an arena, read from the cache when it has them"""
+
+        path = self.cache_path(file_string) if self.cache else None
+        arena = self.read_cache(path) if self.cache else None
+
+        if arena is None:
+            arena = AstArena.new(file_string)
+            arena.store(list(self.parse(file_string, module)))
+
+            if self.cache:
+                self.write_cache(path, arena.dumps())
+
+        return arena
+
+    def parse_imports(self, file_string: str | bytes):
+        """Parses the modules file_string imports, and the ones they import, in parse_jobs worker processes"""
+
+        if self.parse_jobs > 1:
+            self.parsed_modules.update(parse_import_graph(file_string, self, workers=self.parse_jobs))
+
+    def parse_file(self, path: str, file_string: str | bytes, module: "Module") -> tuple[Ast]:
+        """ASTs of the module at path, parse_imports() may have parsed them already"""
+
+        data = self.parsed_modules.pop(os.path.realpath(path), None)
+
+        if data is None:
+            return self.parse_cached(file_string, module)
+
+        arena = AstArena.loads(data)
+
+        return tuple(arena.load(len(arena) - 1, module))
+
+    def interface_path(self, path: str, file_string: str | bytes) -> str:
+        # Modules with the same source declare different types, the interface of each is its own
+        return self.cache_path(file_string, 'interface', f'{self.modules[path].name}\0{path}')
+
+    def read_interface(self, path: str, file_string: str | bytes):
+        """The key, dependencies and state of the interface saved for the module at path with this source, if any"""
+
+        try:
+            with open(self.interface_path(path, file_string), 'rb') as file:
+                return Interfaces.loads_header(file.read())
+        except (OSError, ValueError, EOFError, TypeError, pickle.UnpicklingError):
+            return None
+
+    def write_interface(self, path: str, file_string: str | bytes, additions: list[tuple]):
+        data = self.interfaces.dumps(self, path, file_string, CACHE_VERSION, additions)
+
+        if data is not None:
+            self.write_cache(self.interface_path(path, file_string), data)
+
+    def checkpoint(self) -> tuple:
+        """What rollback() returns the compilation to, the modules registered so far and the types and instances made"""
+
+        return len(self.modules), len(self.interfaces.checking), self.types.mark(), self.specializations.mark()
+
+    def rollback(self, checkpoint: tuple):
+        """Unregisters the modules imported since checkpoint and takes back what they added to the others"""
+
+        length, checking, types, specializations = checkpoint
+        paths = list(self.modules)[length:]
+
+        # Modules that failed while being checked never ended
+        del self.interfaces.checking[checking:]
+        self.interfaces.forget(self, paths)
+
+        for path in paths:
+            del self.modules[path]
+
+        self.types.restore(types)
+        self.specializations.restore(specializations)
+
+    def clear_cache(self):
+        shutil.rmtree(self.cache_directory, ignore_errors=True)
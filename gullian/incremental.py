@@ -0,0 +1,83 @@
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
+from bisect import bisect_left
+
+from .source import Source
+from .lexer import TableLexer, TokenBuffer, TOKENCODE_TEXT, TOKENCODE_COMMENT
+
+if TYPE_CHECKING:
+    from .checker import Module
+
+@dataclass
+class Edit:
+    """Replaces text[start:end] of the lexed buffer by text"""
+
+    start: int
+    end: int
+    text: str
+
+    @property
+    def delta(self):
+        return len(self.text) - (self.end - self.start)
+
+# Past this many shifts they are added to the columns, so reading a token stays cheap
+SHIFTS_LIMIT = 64
+
+def lexeme_start(code: int, start: int):
+    # TokenBuffer keeps the offsets of the value, text literals and comments have a leading quote or '#'
+    if code == TOKENCODE_TEXT or code == TOKENCODE_COMMENT:
+        return start -1
+    
+    return start
+
+def relex(buffer: TokenBuffer, edit: Edit, module: "Module") -> TokenBuffer:
+    """
+    Lexes the buffer again after an edit. Lexing restarts at the token before the edit and stops as soon as
+    a token starts where a token of the previous buffer started, from there both buffers are the same and the
+    remaining tokens are copied with a shift of their offsets and lines, see TokenBuffer.shift()
+    """
+
+    text = buffer.text[:edit.start] + edit.text + buffer.text[edit.end:]
+    edit_end = edit.start + len(edit.text)
+    tokens = range(len(buffer))
+
+    # A token that ends right where the edit starts may be extended by it, so the restart point is the one before
+    restart = bisect_left(tokens, edit.start, key=lambda index: buffer.position(index)[1]) -1
+
+    if restart < 0:
+        restart, restart_position, restart_line = 0, 0, 1
+    else:
+        start, _, restart_line = buffer.position(restart)
+        restart_position = lexeme_start(buffer.codes[restart], start)
+    
+    relexed = TokenBuffer(text, buffer.symbols, buffer.codes[:restart], buffer.starts[:restart], buffer.ends[:restart], buffer.lines[:restart], buffer.shifts[:])
+    # Tokens lexed again are stored as they are
+    relexed.shift(restart, 0, 0)
+    lexer = TableLexer(Source(text, restart_position), module, restart_line)
+
+    for code, start, end, line in lexer.scan():
+        if lexeme_start(code, start) >= edit_end:
+            index = bisect_left(tokens, start - edit.delta, key=lambda index: buffer.position(index)[0])
+
+            if index < len(buffer) and buffer.position(index)[0] == start - edit.delta and buffer.codes[index] == code:
+                line_delta = line - buffer.position(index)[2]
+                shifts = [(index, 0, 0), *(shift for shift in buffer.shifts if shift[0] <= index)][-1:]
+                shifts.extend(shift for shift in buffer.shifts if shift[0] > index)
+                tail = len(relexed) - index
+
+                relexed.codes.extend(buffer.codes[index:])
+                relexed.starts.extend(buffer.starts[index:])
+                relexed.ends.extend(buffer.ends[index:])
+                relexed.lines.extend(buffer.lines[index:])
+
+                for shift_index, offset, shift_line in shifts:
+                    relexed.shift(max(shift_index, index) + tail, offset + edit.delta, shift_line + line_delta)
+
+                if len(relexed.shifts) > SHIFTS_LIMIT:
+                    relexed.settle()
+
+                return relexed
+        
+        relexed.append(code, start, end, line)
+
+    return relexed
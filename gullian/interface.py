@@ -0,0 +1,434 @@
+from typing import TYPE_CHECKING
+from dataclasses import dataclass, field
+import hashlib
+import marshal
+import pickle
+import io
+
+from .lexer import Name, Span
+from .parser import LazyBody
+from .arena import NODE_KINDS
+from .type import BASIC_TYPES, FIRST_UID, Type, Typed, AssociatedFunction
+
+if TYPE_CHECKING:
+    from .checker import Module
+    from .compilation import Compilation
+
+INTERFACE_FORMAT = 6
+
+MISSING = object()
+
+# Anything in a cache directory may have been written by someone else, interfaces only build these classes
+INTERFACE_CLASSES = {
+    f'{__package__}.lexer': {'Token', 'Keyword', 'Literal', 'Comment', 'TokenKind', 'KeywordKind'},
+    f'{__package__}.parser': {kind.__name__ for kind in NODE_KINDS},
+    f'{__package__}.type': {'Type', 'GenericType', 'Typed', 'AssociatedFunction', 'FunctionArgument'},
+    f'{__package__}.checker': {'Scope', 'ScopedDict'},
+    __name__: {'unwrap'},
+}
+
+# What loading a damaged or stale interface raises, the module is checked from its source then
+INTERFACE_ERRORS = (pickle.UnpicklingError, EOFError, LookupError, ValueError)
+
+def own_containers(module: "Module", path: str):
+    """Dictionaries of a module other modules add entries to, like specializations of its generic functions"""
+
+    yield ('functions', path), module.functions
+    yield ('types', path), module.types
+
+    for key, type_ in module.types.items():
+        yield ('associated', path, key), type_.associated_functions
+
+def containers(compilation: "Compilation", exclude: "Module"=None):
+    """Dictionaries of every module of the compilation but exclude and of the basic types, with references to find them again"""
+
+    for path, module in compilation.modules.items():
+        if module is not exclude:
+            yield from own_containers(module, path)
+
+    for name, basic_type in BASIC_TYPES.items():
+        yield ('basic', name), basic_type.associated_functions
+
+def find_container(compilation: "Compilation", reference: tuple) -> dict:
+    kind = reference[0]
+
+    if kind == 'functions':
+        return compilation.modules[reference[1]].functions
+    elif kind == 'types':
+        return compilation.modules[reference[1]].types
+    elif kind == 'associated':
+        return compilation.modules[reference[1]].types[reference[2]].associated_functions
+
+    return BASIC_TYPES[reference[1]].associated_functions
+
+def unwrap(entry, kind: str):
+    """What the entry of a container wraps, functions are referred to by their Typed, AssociatedFunction and declaration"""
+
+    if kind == 'value':
+        return entry.value
+    elif kind == 'declaration':
+        return (entry.value if type(entry) is Typed else entry).declaration
+
+    return entry
+
+class InterfacePickler(pickle.Pickler):
+    """
+    Pickles the state of a checked module. Names are interned again when loaded, spans are dropped and what belongs
+    to other modules is saved as a reference to the dictionary entry holding it. Types are saved by key, the state
+    of the ones the module supplies comes after the rest, see dump_types()
+    """
+
+    def __init__(self, file, compilation: "Compilation", module: "Module", additions: list[tuple], added_by: dict):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+
+        self.compilation = compilation
+        self.module = module
+        self.paths = {id(registered): path for path, registered in compilation.modules.items()}
+        self.foreign = {id(basic_type): (('basic', name), None) for name, basic_type in BASIC_TYPES.items()}
+        self.dependencies = set()
+        self.added = {id(value) for _, _, value in additions}
+        self.added_by = added_by
+        self.types = {}
+
+        for reference, entries in containers(compilation, module):
+            owner = reference[1] if reference[0] != 'basic' else None
+
+            for key, entry in entries.items():
+                if id(entry) in self.added:
+                    continue
+
+                entry_owner = added_by[id(entry)][0] if id(entry) in added_by else owner
+                self.foreign.setdefault(id(entry), (('entry', reference, key), entry_owner))
+
+                if type(entry) is Typed:
+                    self.foreign.setdefault(id(entry.value), (('value', reference, key), entry_owner))
+
+                if type(entry) is AssociatedFunction or (type(entry) is Typed and type(entry.value) is AssociatedFunction):
+                    self.foreign.setdefault(id(unwrap(entry, 'declaration')), (('declaration', reference, key), entry_owner))
+
+    def persistent_id(self, obj):
+        kind = type(obj)
+
+        if kind is Name:
+            return 'name', obj.value, obj.line
+        elif kind is Span:
+            return 'span',
+        elif kind is LazyBody and obj.body is None and obj.module is self.module:
+            # Bodies of the module that were never read are lexed again from its source when they are
+            return 'body', obj.span.start, obj.span.end, obj.brace_line, type(obj.span.buffer) is str
+        elif obj is self.compilation:
+            return 'compilation',
+        elif obj is self.module:
+            return 'module', None
+        elif id(obj) in self.paths:
+            self.dependencies.add(self.paths[id(obj)])
+
+            return 'module', self.paths[id(obj)]
+        elif kind is Type and obj.key is not None and obj.key[0] != 'basic':
+            if obj.module is self.module or id(obj) in self.added:
+                self.types.setdefault(obj.key, obj)
+            elif id(obj) in self.added_by:
+                self.dependencies.add(self.added_by[id(obj)][0])
+            elif id(obj.module) in self.paths:
+                self.dependencies.add(self.paths[id(obj.module)])
+            else:
+                raise pickle.PicklingError(f'no module supplies type {obj.format}')
+
+            return 'type', obj.key, obj.uid
+        elif kind is Type and obj.key is None and obj.uid >= FIRST_UID:
+            # Only basic types and pointers, which have the uid of ptr, are saved with their uid
+            raise pickle.PicklingError(f'type {obj.format} has no key, its uid means nothing to another compilation')
+        elif id(obj) in self.foreign:
+            reference, owner = self.foreign[id(obj)]
+
+            if owner is not None:
+                self.dependencies.add(owner)
+
+            return reference
+
+        return None
+
+    def dump_types(self):
+        """Pickles the state of the types the module supplies, in batches until their states refer to no new one"""
+
+        dumped = set()
+
+        while len(dumped) < len(self.types):
+            states = [(key, {name: value for name, value in type_.__dict__.items() if name not in ('uid', 'key')}) for key, type_ in list(self.types.items()) if key not in dumped]
+            dumped.update(key for key, _ in states)
+            self.dump(states)
+
+        self.dump(None)
+
+    def reducer_override(self, obj):
+        # Bodies of other modules that were never read are parsed now, the interface never refers to their source
+        if type(obj) is LazyBody:
+            return unwrap, (obj.parse(), 'entry')
+
+        return NotImplemented
+
+class InterfaceUnpickler(pickle.Unpickler):
+    def __init__(self, file, compilation: "Compilation", module: "Module", file_string: str | bytes):
+        super().__init__(file)
+
+        self.compilation = compilation
+        self.module = module
+        self.file_string = file_string
+        # Types the compilation didn't have yet, registered once the whole interface is loaded
+        self.types = {}
+        self.uids = set()
+
+    def load_types(self):
+        """Fills the types created while loading, fails if the interface refers to a type nothing supplies"""
+
+        while (states := self.load()) is not None:
+            for key, state in states:
+                if key in self.types:
+                    self.types[key].__dict__.update(state)
+
+        for type_ in self.types.values():
+            if 'name' not in type_.__dict__:
+                raise pickle.UnpicklingError(f'no module supplies type {type_.key}')
+
+    def find_class(self, module: str, name: str):
+        # Types are pickled as Type.from_uid, see Type.__reduce__
+        if (module, name) == ('builtins', 'getattr'):
+            return self.getattr
+        elif name in INTERFACE_CLASSES.get(module, ()):
+            return super().find_class(module, name)
+
+        raise pickle.UnpicklingError(f"an interface can't build {module}.{name}")
+
+    def getattr(self, owner, name: str):
+        if owner is Type and name == 'from_uid':
+            return self.type_from_uid
+
+        raise pickle.UnpicklingError(f"an interface can't read {name} of {owner!r}")
+
+    def type_from_uid(self, uid: int) -> Type:
+        """Types saved by value, the uids of the others are given by this compilation and found by key, see load_type()"""
+
+        if uid >= FIRST_UID:
+            raise pickle.UnpicklingError(f'type uid {uid} of the interface is not one of this compilation')
+
+        return Type.from_uid(uid)
+
+    def load_type(self, key: tuple, uid: int) -> Type:
+        table = self.compilation.types
+
+        if (type_ := table.get(key) or self.types.get(key)) is not None:
+            return type_
+
+        # The uid it had when saved, numbering the types of the same program the same way as checking it would
+        if uid in table.uids or uid in self.uids:
+            uid = max([table.next_uid, *(taken + 1 for taken in self.uids)])
+
+        type_ = self.types[key] = Type.from_uid(uid)
+        type_.key = key
+        self.uids.add(uid)
+
+        return type_
+
+    def persistent_load(self, reference: tuple):
+        kind = reference[0]
+
+        if kind == 'name':
+            return self.compilation.symbols.name(reference[1], reference[2])
+        elif kind == 'span':
+            return None
+        elif kind == 'body':
+            _, start, end, brace_line, is_text = reference
+
+            # Offsets into a file read as text don't hold for its bytes, nor the other way around
+            if (type(self.file_string) is str) != is_text:
+                raise pickle.UnpicklingError('the interface was saved from a source read another way')
+
+            return LazyBody.from_source(Span(self.file_string, start, end), brace_line, self.module)
+        elif kind == 'compilation':
+            return self.compilation
+        elif kind == 'module':
+            return self.module if reference[1] is None else self.compilation.modules[reference[1]]
+        elif kind == 'basic':
+            return BASIC_TYPES[reference[1]]
+        elif kind == 'type':
+            return self.load_type(reference[1], reference[2])
+
+        return unwrap(find_container(self.compilation, reference[1])[reference[2]], kind)
+
+@dataclass
+class Interfaces:
+    """
+    Checked modules of a compilation saved to be loaded by later ones. Checking a module adds entries to the
+    dictionaries of others, so each interface also holds the entries its module added, to add them again on load
+    """
+
+    keys: dict[str, str]=field(default_factory=dict)
+    # Entries of the own dictionaries of a module when it was done, what is added later comes from other modules
+    baselines: dict[tuple, dict]=field(default_factory=dict)
+    # Entries added to the dictionaries of other modules, by id, and the path of the module that added them
+    added_by: dict[int, tuple[str, object]]=field(default_factory=dict)
+    checking: list[str]=field(default_factory=list)
+    # Modules in an import cycle, other modules see them half checked so they are never saved
+    uncacheable: set[str]=field(default_factory=set)
+    # The additions of each module and the entries they replaced, to take them back if the module is forgotten
+    replaced: dict[str, list[tuple]]=field(default_factory=dict)
+
+    def begin(self, compilation: "Compilation", path: str) -> dict:
+        """Called before checking the module at path, returns the snapshot end() compares to"""
+
+        self.checking.append(path)
+
+        return {reference: dict(entries) for reference, entries in containers(compilation, compilation.modules[path])}
+
+    def imported(self, path: str):
+        # Importing a module that is still being checked, the modules in between see each other half checked
+        if path in self.checking:
+            self.uncacheable.update(self.checking[self.checking.index(path):])
+
+    def end(self, compilation: "Compilation", path: str, snapshot: dict) -> list[tuple]:
+        """Returns what checking the module at path added to the other modules, as (container, key, entry)"""
+
+        self.checking.pop()
+
+        module = compilation.modules[path]
+        additions = []
+        previous = []
+
+        for reference, entries in containers(compilation, module):
+            before = snapshot[reference] if reference in snapshot else self.baselines.get(reference, {})
+
+            for key, entry in entries.items():
+                if before.get(key) is not entry and id(entry) not in self.added_by:
+                    additions.append((reference, key, entry))
+                    previous.append(before.get(key, MISSING))
+
+        self.done(module, path, additions, previous)
+
+        return additions
+
+    def done(self, module: "Module", path: str, additions: list[tuple], previous: list):
+        for _, _, entry in additions:
+            self.added_by[id(entry)] = path, entry
+
+        self.replaced[path] = list(zip(additions, previous))
+
+        for reference, entries in own_containers(module, path):
+            self.baselines[reference] = dict(entries)
+
+    def key(self, module_name: str, path: str, file_string: str | bytes, version: str, dependencies: list[tuple]) -> str:
+        digest = hashlib.sha256(f'{version}-{INTERFACE_FORMAT}'.encode())
+        digest.update(f'{module_name}\0{path}\0'.encode())
+        digest.update(file_string.encode() if type(file_string) is str else file_string)
+
+        for _, _, dependency_key, _ in dependencies:
+            digest.update(dependency_key.encode())
+
+        return digest.hexdigest()
+
+    def dumps(self, compilation: "Compilation", path: str, file_string: str | bytes, version: str, additions: list[tuple]) -> bytes | None:
+        """The interface of the checked module at path, None if it can't be saved"""
+
+        module = compilation.modules[path]
+
+        if path in self.uncacheable:
+            return None
+
+        file = io.BytesIO()
+        pickler = InterfacePickler(file, compilation, module, additions, self.added_by)
+
+        try:
+            pickler.dump((module.functions, module.types, module.imports, module.scope, module.includes, additions))
+            pickler.dump_types()
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            return None
+
+        imported = set(self.paths_of(compilation, module.imports.values()))
+        dependencies = pickler.dependencies | imported
+        dependencies.discard(path)
+
+        if any(dependency not in self.keys for dependency in dependencies):
+            return None
+
+        # Dependencies are listed in the order they were imported, which is the order they are loaded in. Only the
+        # ones the module imports itself are checked when loading it, the others must have been loaded before
+        dependencies = [(compilation.modules[dependency].name, dependency, self.keys[dependency], dependency in imported) for dependency in compilation.modules if dependency in dependencies]
+        key = self.keys[path] = self.key(module.name, path, file_string, version, dependencies)
+
+        return marshal.dumps((INTERFACE_FORMAT, key, dependencies, file.getvalue()))
+
+    def paths_of(self, compilation: "Compilation", modules) -> list[str]:
+        paths = {id(module): path for path, module in compilation.modules.items()}
+
+        return [paths[id(module)] for module in modules if id(module) in paths]
+
+    def load(self, compilation: "Compilation", path: str, file_string: str | bytes, key: str, data: bytes):
+        """Fills the module at path from its interface, its dependencies must have been loaded before"""
+
+        module = compilation.modules[path]
+        unpickler = InterfaceUnpickler(io.BytesIO(data), compilation, module, file_string)
+        functions, types, imports, scope, includes, additions = unpickler.load()
+        unpickler.load_types()
+
+        # Specializations this compilation built before are kept where they were, a type is in one module only
+        def built_before(entry):
+            return type(entry) is Type and entry.key is not None and entry.key[0] == 'generic' and entry.key not in unpickler.types
+
+        types = {name: type_ for name, type_ in types.items() if not built_before(type_)}
+        additions = [addition for addition in additions if not built_before(addition[2])]
+
+        previous = []
+
+        try:
+            # Additions may go into the types other additions added, they are applied in order
+            for reference, entry_key, entry in additions:
+                container = find_container(compilation, reference)
+                previous.append(container.get(entry_key, MISSING))
+                container[entry_key] = entry
+        except KeyError:
+            self.replaced[path] = list(zip(additions, previous))
+            self.forget(compilation, [path])
+
+            raise
+
+        for type_ in unpickler.types.values():
+            compilation.types.register(type_)
+
+        module.functions, module.types, module.imports, module.scope, module.includes = functions, types, imports, scope, includes
+
+        self.keys[path] = key
+        self.done(module, path, additions, previous)
+
+    def forget(self, compilation: "Compilation", paths: list[str]):
+        """Takes back what the modules at paths added to the others, before the compilation unregisters them"""
+
+        for path in reversed(paths):
+            for (reference, entry_key, entry), previous in reversed(self.replaced.pop(path, [])):
+                try:
+                    container = find_container(compilation, reference)
+                except KeyError:
+                    continue
+
+                if container.get(entry_key) is entry:
+                    if previous is MISSING:
+                        del container[entry_key]
+                    else:
+                        container[entry_key] = previous
+
+                self.added_by.pop(id(entry), None)
+
+            self.keys.pop(path, None)
+            self.uncacheable.discard(path)
+
+            for reference in [reference for reference in self.baselines if reference[0] != 'basic' and reference[1] == path]:
+                del self.baselines[reference]
+
+    @staticmethod
+    def loads_header(data: bytes):
+        """The key, the dependencies and the pickled state of an interface, None if it was saved by another version"""
+
+        format_, key, dependencies, state = marshal.loads(data)
+
+        if format_ != INTERFACE_FORMAT:
+            return None
+
+        return key, dependencies, state
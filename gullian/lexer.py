@@ -1,6 +1,10 @@
 from typing import TYPE_CHECKING
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from operator import itemgetter
+from bisect import bisect_right
+from array import array
+import re
 
 from .source import Source
 
@@ -16,6 +20,48 @@ class BaseKind:
     def __eq__(self, value: str):
         return self.value == value
 
+def decode_slice(buffer: str | bytes, start: int, end: int) -> str:
+    """Slices a lexed buffer, buffers of bytes (like memory mapped files) are UTF-8 and only the slice is decoded"""
+
+    value = buffer[start:end]
+
+    if type(value) is str:
+        return value
+    
+    value = value.decode('utf-8')
+
+    # Same newline translation as a file read in text mode
+    if '\r' in value:
+        return value.replace('\r\n', '\n').replace('\r', '\n')
+
+    return value
+
+@dataclass(repr=False, slots=True)
+class Span:
+    """Offsets of a lexeme in the buffer it was lexed from, the text is only sliced when asked for"""
+
+    buffer: str
+    start: int
+    end: int
+
+    def __repr__(self):
+        return f'Span({self.start}, {self.end})'
+    
+    # Spans are immutable views, copies of the AST share them with the original
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo: dict):
+        return self
+
+    @property
+    def value(self) -> str:
+        return decode_slice(self.buffer, self.start, self.end)
+    
+    @property
+    def column(self):
+        return self.start - self.buffer.rfind('\n' if type(self.buffer) is str else b'\n', 0, self.start)
+
 class TokenKind(BaseKind, Enum):
     LeftParenthesis=        '('
     RightParenthesis=       ')'
@@ -61,6 +107,26 @@ class TokenKind(BaseKind, Enum):
 
 TOKENKIND_SORTED = sorted(TokenKind.__members__.values(), key=lambda member: len(member.value), reverse=True)
 
+def build_tokenkind_trie() -> dict[str, tuple[TokenKind | None, dict]]:
+    trie = dict()
+
+    for tokenkind in TokenKind.__members__.values():
+        node = trie
+
+        for index, char in enumerate(tokenkind.value):
+            if char not in node:
+                node[char] = (None, dict())
+
+            if index == len(tokenkind.value) -1:
+                node[char] = (tokenkind, node[char][1])
+
+            node = node[char][1]
+
+    return trie
+
+# Maps the first char of every operator to (operator or None, trie of the chars that may follow it)
+TOKENKIND_TRIE = build_tokenkind_trie()
+
 TOKENKIND_UNARYOPERATORS = {
     TokenKind.Interrogation,
     TokenKind.Exclamation,
@@ -105,10 +171,11 @@ TOKENKIND_ASSIGNMENTOPERATORS = {
     TokenKind.RightEqual
 }
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     kind: TokenKind
     line: int
+    span: Span=field(default=None, repr=False, compare=False)
 
     @property
     def format(self):
@@ -139,6 +206,9 @@ class KeywordKind(BaseKind, Enum):
 
 KEYWORDKIND_SORTED = sorted(KeywordKind.__members__.values(), key=lambda member: len(member.value))
 
+KEYWORDKIND_TABLE = {member.value: member for member in KeywordKind.__members__.values()}
+TOKENKIND_TABLE = {member.value: member for member in TokenKind.__members__.values()}
+
 KEYWORDKIND_UNARYOPERATORS = {
     KeywordKind.Not,
 }
@@ -148,10 +218,11 @@ KEYWORDKIND_BINARYOPERATORS = {
     KeywordKind.Or,
 }
 
-@dataclass
+@dataclass(slots=True)
 class Keyword:
     kind: KeywordKind
     line: int
+    span: Span=field(default=None, repr=False, compare=False)
 
     @property
     def format(self):
@@ -161,25 +232,75 @@ class Keyword:
     def value(self):
         return self
 
-@dataclass
+@dataclass(slots=True)
 class Comment:
     value: str
     line: int
+    span: Span=field(default=None, repr=False, compare=False)
 
     @property
     def format(self):
         return f'#{self.value}'
 
-@dataclass(repr=False)
+@dataclass
+class SymbolTable:
+    """Interns the identifiers of a compilation, each distinct identifier gets a dense integer id"""
+
+    symbols: dict[str, int]
+    values: list[str]
+
+    def intern(self, value: str) -> int:
+        symbol = self.symbols.get(value)
+
+        if symbol is None:
+            symbol = self.symbols[value] = len(self.values)
+            self.values.append(value)
+        
+        return symbol
+    
+    def name(self, value: str, line: int=-1, span: Span=None) -> "Name":
+        symbol = self.intern(value)
+
+        return Name(self.values[symbol], line, span, symbol, self)
+
+    @classmethod
+    def new(cls):
+        return cls(dict(), list())
+
 class Name:
-    value: str
-    line: int=-1
+    """
+    Identifier. Names interned in the same symbol table are equal by symbol id without comparing their values,
+    other names (like the ones made up by the checker) compare by value
+    """
+
+    __slots__ = ('value', 'line', 'span', 'symbol', 'symbols')
+
+    def __init__(self, value: str, line: int=-1, span: Span=None, symbol: int=None, symbols: "SymbolTable"=None):
+        self.value = value
+        self.line = line
+        self.span = span
+        self.symbol = symbol
+        self.symbols = symbols
 
     def __hash__(self):
         return hash(self.value)
     
-    def __eq__(self, value: str):
+    def __eq__(self, value: "Name | str"):
+        # Ids are only comparable within a table, names of different compilations meet through the basic types
+        if type(value) is Name and self.symbols is not None and self.symbols is value.symbols:
+            return self.symbol == value.symbol
+
         return self.value == value
+
+    # Names are never changed, copies share them. Pickles keep the value only, the symbol table stays behind
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo: dict):
+        return self
+
+    def __reduce__(self):
+        return Name, (self.value, self.line, self.span)
     
     def __repr__(self):
         return self.value
@@ -188,10 +309,11 @@ class Name:
     def format(self):
         return self.value
 
-@dataclass(repr=False)
+@dataclass(repr=False, slots=True)
 class Literal:
     value: bool | int | float | str
     line: int
+    span: Span=field(default=None, compare=False)
 
     def __repr__(self):
         return repr(self.value)
@@ -203,6 +325,8 @@ class Literal:
     def format(self):
         return repr(self.value)
 
+TEXT_ESCAPE_PATTERN = re.compile(r'\\(.)', re.DOTALL)
+
 @dataclass
 class Lexer:
     source: Source
@@ -210,77 +334,112 @@ class Lexer:
     line: int=1
 
     def scan_comment(self) -> Comment:
-        value = str()
+        start = self.source.position
+        end = None
 
         for char in self.source:
             if char == '\n':
+                end = self.source.position -1
                 break
-            else:
-                value += char
         
-        return Comment(value.strip(), self.line)
+        span = Span(self.source.iterable, start -1, self.source.position if end is None else end)
+
+        return Comment(self.source.iterable[start:span.end].strip(), self.line, span)
     
-    def scan_numeric_literal(self, value: str):
-        char = '.'
+    def scan_numeric_literal(self):
+        start = self.source.position -1
+        char = None
 
         for char in self.source:
-            if char >= '0' and char <= '9':
-                value += char
-            else:
+            if not (char >= '0' and char <= '9'):
                 self.source.release()
                 break
         
         if char == '.':
-            value += self.source.capture()
+            self.source.capture()
             
             for char in self.source:
-                if char >= '0' and char <= '9':
-                    value += char
-                else:
+                if not (char >= '0' and char <= '9'):
                     self.source.release()
                     break
             
-            return Literal(float(value), self.line)
+            span = Span(self.source.iterable, start, self.source.position)
+
+            return Literal(float(span.value), self.line, span)
         
-        return Literal(int(value), self.line)
+        span = Span(self.source.iterable, start, self.source.position)
+
+        return Literal(int(span.value), self.line, span)
     
-    def scan_text_literal(self, quote: str) -> Literal:
-        value = str()
+    def scan_text_literal(self) -> Literal:
+        start = self.source.position
+        end = None
 
         for char in self.source:
             if char == '\\':
-                value += self.source.capture()
+                # A backslash ending the buffer escapes nothing, it's left for scan_token() to reject
+                if self.source.position >= len(self.source.iterable):
+                    self.source.release()
+                    break
+
+                self.source.capture()
                 continue
 
-            if char == quote:
+            if char == self.source.iterable[start -1]:
+                end = self.source.position -1
                 break
-
-            value += char
         
-        return Literal(value, self.line)
+        value = self.source.iterable[start:self.source.position if end is None else end]
+
+        if '\\' in value:
+            value = TEXT_ESCAPE_PATTERN.sub(r'\1', value)
+
+        return Literal(value, self.line, Span(self.source.iterable, start -1, self.source.position))
     
-    def scan_name(self, value: str) -> Name:
+    def scan_name(self) -> Name:
+        start = self.source.position -1
+
         for char in self.source:
-            if char == '_' or char >= 'a' and char <= 'z' or char >= 'A' and char <= 'Z' or char >= '0' and char <= '9':
-                value += char
-            else:
+            if not (char == '_' or char >= 'a' and char <= 'z' or char >= 'A' and char <= 'Z' or char >= '0' and char <= '9'):
                 self.source.release()
                 break
         
-        return Name(value, self.line)
+        span = Span(self.source.iterable, start, self.source.position)
+
+        return Name(span.value, self.line, span)
     
-    def scan_token(self):
-        self.source.release()
+    def scan_token(self, char: str):
+        if char not in TOKENKIND_TRIE:
+            span = Span(self.source.iterable, self.source.position -1, self.source.position)
 
-        for tokenkind in TOKENKIND_SORTED:
-            if self.source.capture(len(tokenkind.value)) == tokenkind.value:
-                return Token(tokenkind, self.line)
-            
-            self.source.release(len(tokenkind.value))
+            raise SyntaxError(f"invalid token {char!r}. at line {self.line}, column {span.column} in module {self.module.name}")
+
+        tokenkind, children = TOKENKIND_TRIE[char]
+        iterable = self.source.iterable
+        position = self.source.position
+        accepted_position = position
+
+        # Maximal munch: walk the trie forward, remembering the longest operator seen so far
+        while children and position < len(iterable) and iterable[position] in children:
+            next_tokenkind, children = children[iterable[position]]
+            position += 1
+
+            if next_tokenkind is not None:
+                tokenkind = next_tokenkind
+                accepted_position = position
         
-        raise SyntaxError(f"invalid token {self.source.capture()!r}. at line {self.line} in module {self.module.name}")
+        if tokenkind is None:
+            span = Span(self.source.iterable, self.source.position -1, self.source.position)
+
+            raise SyntaxError(f"invalid token {char!r}. at line {self.line}, column {span.column} in module {self.module.name}")
+
+        self.source.position = accepted_position
+
+        return Token(tokenkind, self.line, Span(iterable, accepted_position - len(tokenkind.value), accepted_position))
 
     def lex(self):
+        symbols = self.module.compilation.symbols
+
         for char in self.source:
             if char == '\n':
                 self.line += 1
@@ -291,23 +450,268 @@ class Lexer:
             if char == '#':
                 yield self.scan_comment()
             elif char >= 'a' and char <= 'z':
-                name = self.scan_name(char)
+                name = self.scan_name()
 
                 if name == "true":
-                    yield Literal(True, self.line)
+                    yield Literal(True, self.line, name.span)
                 elif name == "false":
-                    yield Literal(False, self.line)
-                elif name.value in KEYWORDKIND_SORTED:
-                    yield Keyword(KeywordKind(name.value), self.line)
+                    yield Literal(False, self.line, name.span)
+                elif name.value in KEYWORDKIND_TABLE:
+                    yield Keyword(KEYWORDKIND_TABLE[name.value], self.line, name.span)
                 else:
-                    yield name
+                    yield symbols.name(name.value, name.line, name.span)
             elif char >= 'A' and char <= 'Z' or char == '_':
-                yield self.scan_name(char)
+                name = self.scan_name()
+
+                yield symbols.name(name.value, name.line, name.span)
             elif char >= '0' and char <= '9':
-                yield self.scan_numeric_literal(char)
+                yield self.scan_numeric_literal()
             elif char == '"' or char == "'":
-                yield self.scan_text_literal(char)
+                yield self.scan_text_literal()
             else:
-                yield self.scan_token()
+                yield self.scan_token(char)
         
         return self
+
+# Kind codes of the compact token representation, shared by TableLexer.scan() and TokenBuffer.
+# Operators and keywords get one code each after the codes of literals and comments, then every
+# name is coded by its symbol id in the SymbolTable of the compilation
+TOKENCODE_INTEGER = 1
+TOKENCODE_FLOAT = 2
+TOKENCODE_TEXT = 3
+TOKENCODE_TRUE = 4
+TOKENCODE_FALSE = 5
+TOKENCODE_COMMENT = 6
+TOKENCODE_KINDS = (*TokenKind.__members__.values(), *KeywordKind.__members__.values())
+TOKENCODE_FIRST_KIND = 7
+TOKENCODE_FIRST_SYMBOL = TOKENCODE_FIRST_KIND + len(TOKENCODE_KINDS)
+TOKENCODE_TABLE = {kind.value: TOKENCODE_FIRST_KIND + index for index, kind in enumerate(TOKENCODE_KINDS)} | {'true': TOKENCODE_TRUE, 'false': TOKENCODE_FALSE}
+
+def token_from_code(code: int, text: str, start: int, end: int, line: int, symbols: SymbolTable):
+    """Builds the token of a code and its value offsets, see TokenBuffer"""
+
+    if code >= TOKENCODE_FIRST_SYMBOL:
+        return Name(symbols.values[code - TOKENCODE_FIRST_SYMBOL], line, Span(text, start, end), code - TOKENCODE_FIRST_SYMBOL, symbols)
+    elif code >= TOKENCODE_FIRST_KIND:
+        kind = TOKENCODE_KINDS[code - TOKENCODE_FIRST_KIND]
+
+        if type(kind) is TokenKind:
+            return Token(kind, line, Span(text, start, end))
+        
+        return Keyword(kind, line, Span(text, start, end))
+    elif code == TOKENCODE_INTEGER:
+        return Literal(int(text[start:end]), line, Span(text, start, end))
+    elif code == TOKENCODE_FLOAT:
+        return Literal(float(text[start:end]), line, Span(text, start, end))
+    elif code == TOKENCODE_TEXT:
+        value = decode_slice(text, start, end)
+
+        if '\\' in value:
+            value = TEXT_ESCAPE_PATTERN.sub(r'\1', value)
+
+        # The span covers the quotes, the closing one is missing when the literal runs until the end of the buffer
+        return Literal(value, line, Span(text, start -1, end +1 if end < len(text) and text[end] == text[start -1] else end))
+    elif code == TOKENCODE_TRUE:
+        return Literal(True, line, Span(text, start, end))
+    elif code == TOKENCODE_FALSE:
+        return Literal(False, line, Span(text, start, end))
+    elif code == TOKENCODE_COMMENT:
+        return Comment(decode_slice(text, start, end).strip(), line, Span(text, start -1, end))
+    
+    raise ValueError(f"invalid token code {code}")
+
+@dataclass
+class TokenBuffer:
+    """
+    Token stream stored as parallel array columns, tokens are materialized on demand when indexed.
+    The start and end offsets delimit the value of the token in text, without quotes or '#'.
+    Edits shift the tokens after them lazily, every (index, offset, line) in shifts is added to the
+    columns from that index on, until the next shift
+    """
+
+    text: str
+    symbols: SymbolTable
+    codes: array
+    starts: array
+    ends: array
+    lines: array
+    shifts: list = field(default_factory=list)
+
+    def append(self, code: int, start: int, end: int, line: int):
+        self.codes.append(code)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+    
+    def shift(self, index: int, offset: int, line: int):
+        """Shifts the tokens from index on, replacing the shifts of the tokens after it"""
+
+        while self.shifts and self.shifts[-1][0] >= index:
+            self.shifts.pop()
+        
+        if (offset, line) != (self.shifts[-1][1:] if self.shifts else (0, 0)):
+            self.shifts.append((index, offset, line))
+    
+    def settle(self):
+        """Adds the shifts to the columns"""
+
+        ends = [index for index, _, _ in self.shifts[1:]] + [len(self.codes)]
+
+        for (index, offset, line), end in zip(self.shifts, ends):
+            if offset:
+                self.starts[index:end] = array('I', map(offset.__add__, self.starts[index:end]))
+                self.ends[index:end] = array('I', map(offset.__add__, self.ends[index:end]))
+            
+            if line:
+                self.lines[index:end] = array('I', map(line.__add__, self.lines[index:end]))
+        
+        self.shifts.clear()
+
+    def position(self, index: int) -> tuple[int, int, int]:
+        """The start, end and line of a token, shifted"""
+
+        start, end, line = self.starts[index], self.ends[index], self.lines[index]
+
+        if self.shifts:
+            if index < 0:
+                index += len(self.codes)
+
+            shift = bisect_right(self.shifts, index, key=itemgetter(0)) -1
+
+            if shift >= 0:
+                _, offset, line_delta = self.shifts[shift]
+
+                return start + offset, end + offset, line + line_delta
+        
+        return start, end, line
+
+    def __len__(self):
+        return len(self.codes)
+    
+    def __getitem__(self, index: int | slice):
+        if type(index) is slice:
+            return tuple(self[position] for position in range(*index.indices(len(self.codes))))
+        
+        return token_from_code(self.codes[index], self.text, *self.position(index), self.symbols)
+    
+    def __iter__(self):
+        for index in range(len(self.codes)):
+            yield self[index]
+
+    @classmethod
+    def new(cls, text: str, symbols: SymbolTable):
+        return cls(text, symbols, array('I'), array('I'), array('I'), array('I'))
+
+def build_table_pattern(newline: str, line_char: str, invalid: str) -> str:
+    """
+    Master pattern of the table driven lexer, every alternative mirrors one of the Lexer.scan_* methods.
+    The last alternative catches any character that can't start a lexeme, so the scan never skips input
+    """
+
+    return '|'.join([
+        r'(?P<blank>[ \t]+)',
+        rf'(?P<newline>{newline})',
+        r'(?P<name>[a-zA-Z_][a-zA-Z0-9_]*)',
+        r'(?P<token>' + '|'.join(re.escape(tokenkind.value) for tokenkind in TOKENKIND_SORTED) + ')',
+        r'(?P<float>[0-9]+\.[0-9]*)',
+        r'(?P<integer>[0-9]+)',
+        r'"(?P<double_quoted>(?:\\.|[^"\\])*)"?',
+        r"'(?P<single_quoted>(?:\\.|[^'\\])*)'?",
+        # NOTE: like Lexer.scan_comment(), the newline ending a comment is consumed without counting a line
+        rf'#(?P<comment>{line_char}*)(?:{newline})?',
+        rf'(?P<invalid>{invalid})',
+    ])
+
+TABLE_PATTERN = re.compile(build_table_pattern(r'\n', r'[^\n]', r'.'), re.DOTALL)
+
+# The same pattern and table, to lex UTF-8 buffers of bytes such as memory mapped files. These
+# are not translated like files opened in text mode, so any of the universal newlines ends a line.
+# An invalid char takes its whole UTF-8 sequence, so that it can be decoded for the error message
+TABLE_PATTERN_BYTES = re.compile(build_table_pattern(r'\r\n|\r|\n', r'[^\r\n]', r'[\xc0-\xff][\x80-\xbf]*|.').encode(), re.DOTALL)
+TOKENCODE_TABLE_BYTES = {value.encode(): code for value, code in TOKENCODE_TABLE.items()}
+
+@dataclass
+class TableLexer:
+    source: Source
+    module: "Module"
+    line: int=1
+
+    def scan(self):
+        """Yields (code, start, end, line) for every token, see TokenBuffer"""
+
+        symbols = self.module.compilation.symbols
+
+        if type(self.source.iterable) is str:
+            pattern, table = TABLE_PATTERN, TOKENCODE_TABLE
+        else:
+            pattern, table = TABLE_PATTERN_BYTES, TOKENCODE_TABLE_BYTES
+
+        for match in pattern.finditer(self.source.iterable, self.source.position):
+            kind = match.lastgroup
+
+            if kind == 'blank':
+                continue
+            elif kind == 'newline':
+                self.line += 1
+            elif kind == 'name':
+                start, end = match.span()
+                value = match.group()
+                code = table.get(value)
+
+                if code is None:
+                    code = TOKENCODE_FIRST_SYMBOL + symbols.intern(value if type(value) is str else value.decode('ascii'))
+
+                yield code, start, end, self.line
+            elif kind == 'token':
+                start, end = match.span()
+
+                yield table[match.group()], start, end, self.line
+            elif kind == 'integer':
+                start, end = match.span()
+
+                yield TOKENCODE_INTEGER, start, end, self.line
+            elif kind == 'float':
+                start, end = match.span()
+
+                yield TOKENCODE_FLOAT, start, end, self.line
+            elif kind == 'double_quoted' or kind == 'single_quoted':
+                start, end = match.span(kind)
+
+                yield TOKENCODE_TEXT, start, end, self.line
+            elif kind == 'comment':
+                start, end = match.span(kind)
+
+                yield TOKENCODE_COMMENT, start, end, self.line
+            else:
+                span = Span(self.source.iterable, *match.span())
+
+                raise SyntaxError(f"invalid token {span.value!r}. at line {self.line}, column {span.column} in module {self.module.name}")
+
+        self.source.position = len(self.source.iterable)
+
+    def lex(self):
+        text = self.source.iterable
+        symbols = self.module.compilation.symbols
+
+        for code, start, end, line in self.scan():
+            yield token_from_code(code, text, start, end, line, symbols)
+
+        return self
+    
+    def lex_buffer(self) -> TokenBuffer:
+        buffer = TokenBuffer.new(self.source.iterable, self.module.compilation.symbols)
+
+        for code, start, end, line in self.scan():
+            buffer.append(code, start, end, line)
+
+        return buffer
+
+LEXERS = {
+    'source': Lexer,
+    'table': TableLexer,
+}
+
+# Engines that can lex UTF-8 bytes directly, the others need the whole file decoded first
+LEXERS_OF_BYTES = {
+    'table',
+}
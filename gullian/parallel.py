@@ -0,0 +1,163 @@
+from typing import TYPE_CHECKING
+from concurrent.futures import Executor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import replace
+from array import array
+import re
+import os
+
+from .source import Source
+from .lexer import TableLexer, TokenBuffer, SymbolTable, TOKENCODE_FIRST_SYMBOL
+from .interface import Interfaces
+from .type import TypeTable, Specializations
+
+if TYPE_CHECKING:
+    from .checker import Module
+    from .compilation import Compilation
+
+# Sources smaller than this are lexed serially, starting the workers would take longer than lexing
+PARALLEL_THRESHOLD = 256 * 1024
+
+# Newlines outside of text literals and comments, where the table lexer is always between two tokens.
+# Literals may be unterminated and comments consume their newline, so none of them is a split point
+SPLIT_PATTERN = re.compile(r'''"(?:\\.|[^"\\])*"?|'(?:\\.|[^'\\])*'?|#[^\n]*\n?|(?P<newline>\n)''', re.DOTALL)
+SPLIT_PATTERN_BYTES = re.compile(SPLIT_PATTERN.pattern.replace(r'[^\n]', r'[^\r\n]').replace(r'\n?', r'(?:\r\n|\r|\n)?').encode(), re.DOTALL)
+
+# Imports at the start of a line. Lines inside of text literals may match too, modules they name are parsed for nothing
+IMPORT_PATTERN = re.compile(r'^[ \t]*import[ \t]+([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)', re.MULTILINE)
+IMPORT_PATTERN_BYTES = re.compile(IMPORT_PATTERN.pattern.encode(), re.MULTILINE)
+
+def split_points(text: str | bytes, chunks: int) -> list[int]:
+    """Offsets that cut text in at most the given number of chunks of about the same size, the first one is always 0"""
+
+    pattern = SPLIT_PATTERN if type(text) is str else SPLIT_PATTERN_BYTES
+    size = len(text) // chunks
+    points = [0]
+
+    for match in pattern.finditer(text):
+        if match.lastgroup == 'newline' and match.end() - points[-1] >= size:
+            points.append(match.end())
+
+            if len(points) == chunks:
+                break
+
+    return points
+
+def lex_chunk(text: str | bytes, module_name: str):
+    """Runs in a worker. Returns the columns of the chunk, the line it ended at and the names it interned, in order"""
+
+    from .checker import Module
+
+    module = Module.new(module_name)
+    lexer = TableLexer(Source(text), module)
+    buffer = lexer.lex_buffer()
+
+    return buffer.codes, buffer.starts, buffer.ends, buffer.lines, lexer.line, module.compilation.symbols.values
+
+def lex_parallel(text: str | bytes, module: "Module", executor: Executor=None, workers: int=None, threshold: int=PARALLEL_THRESHOLD) -> TokenBuffer:
+    """
+    Lexes text in chunks split at newlines, then joins their columns into a single TokenBuffer that is identical
+    to the one of TableLexer.lex_buffer(). Chunks start at line 1 and are shifted by the lines of the ones before
+    """
+
+    workers = workers or os.cpu_count() or 1
+
+    if len(text) < threshold or workers < 2:
+        return TableLexer(Source(text), module).lex_buffer()
+
+    points = split_points(text, workers)
+    chunks = [text[start:end] for start, end in zip(points, points[1:] + [len(text)])]
+    own_executor = executor is None
+    executor = executor or ProcessPoolExecutor(workers)
+
+    try:
+        results = list(executor.map(lex_chunk, chunks, [module.name] * len(chunks)))
+    except SyntaxError:
+        # Errors of a chunk have lines relative to it, lexing serially reports the right one
+        return TableLexer(Source(text), module).lex_buffer()
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    symbols = module.compilation.symbols
+    buffer = TokenBuffer.new(text, symbols)
+    line = 1
+
+    for point, (codes, starts, ends, lines, end_line, values) in zip(points, results):
+        # Names are interned in the order each chunk first saw them, which is the order of the serial lexer
+        symbol_codes = [TOKENCODE_FIRST_SYMBOL + symbols.intern(value) for value in values]
+
+        buffer.codes.extend(code if code < TOKENCODE_FIRST_SYMBOL else symbol_codes[code - TOKENCODE_FIRST_SYMBOL] for code in codes)
+        buffer.starts.extend(start + point for start in starts)
+        buffer.ends.extend(end + point for end in ends)
+        buffer.lines.extend(chunk_line + line - 1 for chunk_line in lines)
+
+        line += end_line - 1
+
+    return buffer
+
+def scan_imports(text: str | bytes) -> list[str]:
+    """Names of the modules text imports, found without lexing it"""
+
+    if type(text) is str:
+        return IMPORT_PATTERN.findall(text)
+
+    return [module_name.decode() for module_name in IMPORT_PATTERN_BYTES.findall(text)]
+
+def parse_module(path: str, module_name: str, compilation: "Compilation"):
+    """Runs in a worker. Returns the ASTs of the module at path dumped from an arena, and the modules it imports"""
+
+    from .checker import Module
+
+    file_string = compilation.load(path)
+    arena = compilation.parse_arena(file_string, Module.new(module_name, compilation))
+
+    return arena.dumps(), scan_imports(file_string)
+
+def parse_import_graph(file_string: str | bytes, compilation: "Compilation", executor: Executor=None, workers: int=None) -> dict[str, bytes]:
+    """
+    Parses every module reachable through the imports of file_string in worker processes, a module is sent to them
+    as soon as an import of it is found. Returns the dumped arenas of the modules by the real path of their files
+    """
+
+    workers = workers or os.cpu_count() or 1
+    # Workers get the options of the compilation, but names are interned again when the arenas are loaded.
+    # Their parsers are not profiled
+    options = replace(compilation, lex_jobs=1, lazy_bodies=False, profile=None, symbols=SymbolTable.new(), parsed_modules={}, modules={}, interfaces=Interfaces(), types=TypeTable.new(), specializations=Specializations())
+    own_executor = executor is None
+    executor = executor or ProcessPoolExecutor(workers)
+    pending = {}
+    seen = set()
+    parsed = {}
+
+    def submit(module_names: list[str]):
+        for module_name in module_names:
+            path = compilation.resolver.resolve(module_name)
+
+            # Missing modules are reported by the checker, when it reaches their import
+            if path is None or os.path.realpath(path) in seen:
+                continue
+
+            seen.add(os.path.realpath(path))
+            pending[executor.submit(parse_module, os.path.realpath(path), module_name, options)] = os.path.realpath(path)
+
+    try:
+        submit(scan_imports(file_string))
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                path = pending.pop(future)
+
+                try:
+                    parsed[path], imports = future.result()
+                except Exception:
+                    # The checker parses the module again and reports the error at the import of it
+                    continue
+
+                submit(imports)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    return parsed
@@ -1,14 +1,16 @@
-from typing import TYPE_CHECKING
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, Sequence
+from dataclasses import dataclass, field
+from collections import deque
+import copy
 
-from .source import Source
 from .lexer import TOKENKIND_UNARYOPERATORS, TOKENKIND_BINARYOPERATORS, TOKENKIND_ASSIGNMENTOPERATORS, KEYWORDKIND_UNARYOPERATORS, KEYWORDKIND_BINARYOPERATORS
-from .lexer import Token, Keyword, TokenKind, KeywordKind, Name, Literal, Comment
+from .lexer import Token, Keyword, TokenKind, KeywordKind, Name, Literal, Comment, Span, TableLexer
+from .source import Source
 
 if TYPE_CHECKING:
     from .checker import Module
 
-@dataclass
+@dataclass(slots=True)
 class Body:
     lines: list["Ast"]
 
@@ -23,7 +25,77 @@ class Body:
         
         return 0
 
-@dataclass
+class LazyBody:
+    """
+    Body of a function whose tokens were skipped by matching braces, it is parsed the first time its lines are
+    read. Syntax errors inside of it are only reported then. The span covers the braces, a body saved before it
+    was parsed is lexed again from there
+    """
+
+    __slots__ = ('parser', 'position', 'span', 'brace_line', 'body')
+
+    def __init__(self, parser: "Parser", position: int | None, span: Span, brace_line: int):
+        self.parser = parser
+        self.position = position
+        self.span = span
+        self.brace_line = brace_line
+        self.body = None
+
+    @classmethod
+    def from_source(cls, span: Span, brace_line: int, module: "Module"):
+        """A body saved unparsed, its tokens are lexed from the brace as they are parsed"""
+
+        return cls(Parser.new(TableLexer(Source(span.buffer, span.start), module, brace_line).lex(), module), None, span, brace_line)
+
+    @property
+    def module(self) -> "Module":
+        return self.parser.module
+
+    def parse(self) -> Body:
+        if self.body is None:
+            parser = self.parser
+
+            if self.position is None:
+                self.body = parser.parse_body()
+            else:
+                # The parser that skipped the body parses it, from a cursor at its brace
+                cursor, parser.cursor = parser.cursor, TokenCursor(parser.cursor.tokens, parser.module, self.position)
+
+                try:
+                    self.body = parser.parse_body()
+                finally:
+                    parser.cursor = cursor
+
+            self.parser = None
+
+        return self.body
+
+    @property
+    def lines(self):
+        return self.parse().lines
+    
+    @lines.setter
+    def lines(self, lines: list["Ast"]):
+        self.parse().lines = lines
+
+    @property
+    def format(self):
+        return '{ ... }'
+    
+    @property
+    def line(self):
+        return self.parse().line
+
+    def __eq__(self, other):
+        return self.parse() == other
+    
+    def __repr__(self):
+        return repr(self.parse())
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self.parse(), memo)
+
+@dataclass(slots=True)
 class FunctionHead:
     name: "Name | Subscript"
     arguments: list[tuple[Name, "Expression"]]
@@ -39,7 +111,7 @@ class FunctionHead:
     def line(self):
         return self.name.line
 
-@dataclass
+@dataclass(slots=True)
 class StructDeclaration:
     name: Name
     fields: list[tuple[Name, "Expression"]]
@@ -53,7 +125,7 @@ class StructDeclaration:
     def line(self):
         return self.name.line
 
-@dataclass
+@dataclass(slots=True)
 class UnionDeclaration:
     name: Name
     fields: list[tuple[Name, "Expression"]]
@@ -67,7 +139,7 @@ class UnionDeclaration:
     def line(self):
         return self.name.line
 
-@dataclass
+@dataclass(slots=True)
 class Extern:
     head: FunctionHead
 
@@ -79,7 +151,7 @@ class Extern:
     def line(self):
         return self.head.line
 
-@dataclass
+@dataclass(slots=True)
 class Import:
     module_name: "Name | Attribute"
 
@@ -91,7 +163,7 @@ class Import:
     def line(self):
         return self.module_name.line
 
-@dataclass
+@dataclass(slots=True)
 class EnumDeclaration:
     name: Name
     fields: tuple[Name]
@@ -108,7 +180,7 @@ class EnumDeclaration:
     def generic(self):
         return []
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDeclaration:
     head: FunctionHead
     body: Body
@@ -125,7 +197,7 @@ class FunctionDeclaration:
     def line(self):
         return self.head.line
 
-@dataclass
+@dataclass(slots=True)
 class VariableDeclaration:
     name: Name
     value: "Expression"
@@ -142,7 +214,7 @@ class VariableDeclaration:
     def line(self):
         return self.name.line
 
-@dataclass
+@dataclass(slots=True)
 class If:
     condition: "Expression"
     true_body: Body
@@ -159,7 +231,7 @@ class If:
     def line(self):
         return self.condition.line
 
-@dataclass
+@dataclass(slots=True)
 class While:
     condition: "Expression"
     body: Body
@@ -172,7 +244,7 @@ class While:
     def line(self):
         return self.condition.line
 
-@dataclass
+@dataclass(slots=True)
 class For:
     head_target: "Expression"
     head_iterator: "Expression"
@@ -187,7 +259,7 @@ class For:
     def line(self):
         return self.head_target.line
 
-@dataclass
+@dataclass(slots=True)
 class Return:
     value: "Expression"
 
@@ -199,7 +271,7 @@ class Return:
     def line(self):
         return self.value.line
 
-@dataclass
+@dataclass(slots=True)
 class Comptime:
     value: "Expression"
 
@@ -211,7 +283,7 @@ class Comptime:
     def line(self):
         return self.value.line
     
-@dataclass
+@dataclass(slots=True)
 class Switch:
     expression: "Expression"
     branches: dict["Expression", "Expression"]
@@ -228,7 +300,7 @@ class Switch:
     def line(self):
         return self.expression.line
 
-@dataclass
+@dataclass(slots=True)
 class Call:
     name: Name
     arguments: list["Expression"]
@@ -246,7 +318,7 @@ class Call:
     def line(self):
         return self.name.line
 
-@dataclass
+@dataclass(slots=True)
 class StructLiteral:
     name: Name
     arguments: list["Expression | tuple[Name, Expression]"]
@@ -260,7 +332,7 @@ class StructLiteral:
     def line(self):
         return self.name.line
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOperator:
     operator: Token | Keyword
     expression: "Expression"
@@ -273,7 +345,7 @@ class UnaryOperator:
     def line(self):
         return self.operator.line
 
-@dataclass
+@dataclass(slots=True)
 class TestGuard:
     expression: "Expression"
 
@@ -285,7 +357,7 @@ class TestGuard:
     def line(self):
         return self.expression.line  
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOperator:
     left: "Expression"
     operator: Token | Keyword
@@ -299,7 +371,7 @@ class BinaryOperator:
     def line(self):
         return self.left.line
 
-@dataclass
+@dataclass(slots=True)
 class Subscript:
     head: "Name | Attribute | Subscript"
     items: tuple["Name | Attribute | Subscript"]
@@ -315,7 +387,7 @@ class Subscript:
     def line(self):
         return self.head.line
 
-@dataclass
+@dataclass(slots=True)
 class Attribute:
     left: "Name | Attribute"
     right: "Name | Attribute"
@@ -345,7 +417,7 @@ class Attribute:
         
         return self.left
 
-@dataclass
+@dataclass(slots=True)
 class Assignment:
     name: "Name | Attribute"
     operator: Token
@@ -359,19 +431,127 @@ class Assignment:
     def line(self):
         return self.name.line
 
+# From the loosest to the tightest, like C. Prefix operators other than 'not' bind tighter than all of them
+BINARYOPERATOR_PRECEDENCE = {
+    KeywordKind.Or: 1,
+    KeywordKind.And: 2,
+    TokenKind.VerticalBar: 4,
+    TokenKind.Caret: 5,
+    TokenKind.Ampersand: 6,
+    TokenKind.EqualEqual: 7,
+    TokenKind.NotEqual: 7,
+    TokenKind.GreaterThan: 8,
+    TokenKind.LessThan: 8,
+    TokenKind.GreaterThanEqual: 8,
+    TokenKind.LessThanEqual: 8,
+    TokenKind.Left: 9,
+    TokenKind.Right: 9,
+    TokenKind.Plus: 10,
+    TokenKind.Minus: 10,
+    TokenKind.Star: 11,
+    TokenKind.Slash: 11,
+    TokenKind.Percent: 11,
+    TokenKind.StarStar: 12,
+}
+
+RIGHT_ASSOCIATIVE_OPERATORS = {
+    TokenKind.StarStar,
+}
+
+OPERATOR_PRECEDENCE = BINARYOPERATOR_PRECEDENCE | {
+    KeywordKind.Not: 3,
+}
+
+assert BINARYOPERATOR_PRECEDENCE.keys() == TOKENKIND_BINARYOPERATORS | KEYWORDKIND_BINARYOPERATORS
+assert OPERATOR_PRECEDENCE.keys() >= KEYWORDKIND_UNARYOPERATORS
+
 Expression = Name | Literal | Call | StructLiteral | Attribute | BinaryOperator
 TypeDeclaration = EnumDeclaration | StructDeclaration | UnionDeclaration
 Ast = Expression | TypeDeclaration | FunctionDeclaration | VariableDeclaration | Assignment | While | If
 
+@dataclass
+class TokenCursor:
+    """Walks a sequence of tokens forwards, the parser peeks at the tokens ahead instead of capturing and releasing them"""
+
+    tokens: Sequence[Token]
+    module: "Module"
+    position: int=0
+
+    def __iter__(self):
+        while (token := self.advance()) is not None:
+            yield token
+
+    def peek(self, k: int=0) -> Token | None:
+        try:
+            return self.tokens[self.position + k]
+        except IndexError:
+            return None
+
+    def advance(self) -> Token | None:
+        try:
+            token = self.tokens[self.position]
+        except IndexError:
+            token = None
+
+        self.position += 1
+
+        return token
+
+    def expect(self, kind: TokenKind | KeywordKind) -> Token | Keyword:
+        token = self.advance()
+
+        if (type(token) is Token or type(token) is Keyword) and token.kind is kind:
+            return token
+        elif token is None:
+            raise SyntaxError(f"expecting '{kind.value}', found end of file. in module {self.module.name}")
+
+        raise SyntaxError(f"expecting '{kind.value}', found '{token.format}'. at line {token.line}. in module {self.module.name}")
+
+@dataclass
+class StreamCursor(TokenCursor):
+    """TokenCursor over an iterator, such as a lexer that is still running. Only the tokens peeked at are kept"""
+
+    tokens: Iterator[Token]
+    ahead: deque=field(default_factory=deque)
+
+    def peek(self, k: int=0) -> Token | None:
+        while len(self.ahead) <= k:
+            token = next(self.tokens, None)
+
+            if token is None:
+                return None
+            
+            self.ahead.append(token)
+
+        return self.ahead[k]
+
+    def advance(self) -> Token | None:
+        self.position += 1
+
+        if self.ahead:
+            return self.ahead.popleft()
+        
+        return next(self.tokens, None)
+
 @dataclass
 class Parser:
-    source: Source
+    cursor: TokenCursor
     module: "Module"
+    lazy: bool=False
+
+    @classmethod
+    def new(cls, tokens: Sequence[Token] | Iterator[Token], module: "Module", lazy: bool=False):
+        """With lazy, the bodies of functions are parsed when first read. Streamed tokens are gone by then, so they are never lazy"""
+
+        if hasattr(tokens, '__getitem__'):
+            return cls(TokenCursor(tokens, module), module, lazy)
+        
+        return cls(StreamCursor(iter(tokens), module), module)
 
     def parse_call(self, name: Name) -> Call:
         arguments = []
 
-        for token in self.source:
+        for token in self.cursor:
             if type(token) is Token and token.kind is TokenKind.RightParenthesis:
                 break
             elif type(token) is Token and token.kind is TokenKind.Comma:
@@ -387,54 +567,51 @@ class Parser:
     def parse_struct_literal(self, name: Name):
         arguments = []
 
-        for token in self.source:
+        for token in self.cursor:
             if type(token) is Token and token.kind is TokenKind.RightBrace:
                 break
             elif type(token) is Token and token.kind is TokenKind.Comma:
                 continue
 
             if type(token) is Name:
-                next_token = self.source.capture()
+                next_token = self.cursor.peek()
 
                 if type(next_token) is Token:
                     if next_token.kind is TokenKind.Comma:
+                        self.cursor.advance()
                         arguments.append(token)
                         continue
 
                     elif next_token.kind is TokenKind.Colon:
-                        arguments.append((token, self.parse_expression(self.source.capture())))
+                        self.cursor.advance()
+                        arguments.append((token, self.parse_expression(self.cursor.advance())))
                         continue
 
-                self.source.release()
-
             arguments.append(self.parse_expression(token))
 
         return StructLiteral(name, arguments)
     
     def parse_attribute(self, name: Name) -> Attribute:
-        token = self.source.capture()
+        while True:
+            token = self.cursor.peek()
 
-        if type(token) is Token and token.kind is TokenKind.Dot:
-            next_name = self.source.capture()
+            if not (type(token) is Token and token.kind is TokenKind.Dot):
+                return name
+            
+            self.cursor.advance()
+            next_name = self.cursor.advance()
 
             if type(next_name) is not Name:
                 raise TypeError(f"expecting a Name asfter {name}, got {next_name}. at line {name.line}. in module {self.module.name}")
 
-            return self.parse_attribute(Attribute(name, next_name))
-        else:
-            self.source.release()
-        
-        return name
+            name = Attribute(name, next_name)
     
     def parse_subscript(self, name: Name):
-        token = self.source.capture()
-
-        if not (type(token) is Token and token.kind is TokenKind.LeftBracket):
-            raise SyntaxError(f"expected '[', got {token.format}. at line {token.line}. in module {self.module.name}")
+        self.cursor.expect(TokenKind.LeftBracket)
         
         items = []
 
-        for token in self.source:
+        for token in self.cursor:
             if type(token) is Token:
                 if token.kind is TokenKind.RightBracket:
                     break
@@ -449,107 +626,151 @@ class Parser:
         if not (type(name) is Name or type(name) is Attribute or type(name) is Subscript):
             raise TypeError(f'name must be Name, Attribute or Subscript, found Token "{name.format}". in line {name.line}. at module {self.module.name}')
         
-        token = self.source.capture()
+        while True:
+            token = self.cursor.peek()
 
-        if type(token) is Token:
-            if token.kind is TokenKind.Dot:
-                self.source.release()
-                
-                return self.parse_type_name(self.parse_attribute(name))
-            
-            elif token.kind is TokenKind.LeftBracket:
-                self.source.release()
+            if type(token) is Token and token.kind is TokenKind.Dot:
+                name = self.parse_attribute(name)
+            elif type(token) is Token and token.kind is TokenKind.LeftBracket:
+                name = self.parse_subscript(name)
+            else:
+                return name
 
-                return self.parse_type_name(self.parse_subscript(name))
+    def parse_parenthesized(self, left_parenthesis: Token, terminals: set[TokenKind]):
+        right_parenthesis = self.cursor.peek()
 
-        self.source.release()
+        if type(right_parenthesis) is Token and right_parenthesis.kind is TokenKind.RightParenthesis:
+            raise SyntaxError(f"Empty parenthesized expression, at line {left_parenthesis.line}. in module {self.module.name}")
 
-        return name
+        expression = self.parse_expression(self.cursor.advance(), terminals={TokenKind.RightParenthesis} | terminals)
 
-    def parse_expression(self, expression: Expression, terminals: set[TokenKind]=set()):
-        if type(expression) is Token:
-            if expression.kind in TOKENKIND_UNARYOPERATORS:
-                return self.parse_expression(UnaryOperator(expression, self.parse_expression(self.source.capture(), terminals)), terminals)
-            elif expression.kind is TokenKind.LeftParenthesis:
-                right_parenthesis = self.source.capture()
+        right_parenthesis = self.cursor.advance()
 
-                if type(right_parenthesis) is Token and right_parenthesis.kind is TokenKind.RightParenthesis:
-                    raise SyntaxError(f"Empty parenthesized expression, at line {expression.line}. in module {self.module.name}")
-                else:
-                    self.source.release()
+        if type(right_parenthesis) is Keyword:
+            raise SyntaxError(f"Unexpected keyword '{right_parenthesis.format}' when parsing parenthesized expression, at line {expression.line}. in module {self.module.name}")
 
-                expression = self.parse_expression(self.source.capture(), terminals={TokenKind.RightParenthesis} | terminals)
+        elif not (type(right_parenthesis) is Token and right_parenthesis.kind is TokenKind.RightParenthesis):
+            raise SyntaxError(f"Empty parenthesized expression, at line {expression.line}. in module {self.module.name}")
+        
+        return expression
 
-                right_parenthesis = self.source.capture()
+    def parse_operand(self, expression: Expression, terminals: set[TokenKind]):
+        """Parses the prefix operators, a primary expression and its postfix chain. Prefix operators bind looser than postfix ones"""
 
-                if type(right_parenthesis) is Keyword:
-                    raise SyntaxError(f"Unexpected keyword '{right_parenthesis.format}' when parsing parenthesized expression, at line {expression.line}. in module {self.module.name}")
+        prefixes = []
 
-                elif not (type(right_parenthesis) is Token and right_parenthesis.kind is TokenKind.RightParenthesis):
-                    raise SyntaxError(f"Empty parenthesized expression, at line {expression.line}. in module {self.module.name}")
-                
-                return self.parse_expression(expression, terminals)
+        while (type(expression) is Token and expression.kind in TOKENKIND_UNARYOPERATORS) or (type(expression) is Keyword and expression.kind in KEYWORDKIND_UNARYOPERATORS):
+            prefixes.append(expression)
+            expression = self.cursor.advance()
+
+        if type(expression) is Token:
+            if expression.kind is not TokenKind.LeftParenthesis:
+                raise TypeError(f"expression must be Ast, found Token '{expression.format}'. in line {expression.line}. at module {self.module.name}")
             
-            raise TypeError(f"expression must be Ast, found Token '{expression.format}'. in line {expression.line}. at module {self.module.name}")
+            expression = self.parse_parenthesized(expression, terminals)
         elif type(expression) is Keyword:
-            if expression.kind in KEYWORDKIND_UNARYOPERATORS:
-                return self.parse_expression(UnaryOperator(expression, self.parse_expression(self.source.capture(), terminals)), terminals)
-            elif expression.kind is KeywordKind.Comptime:
-                return self.parse_comptime()
+            if expression.kind is KeywordKind.Comptime:
+                expression = self.parse_comptime()
             elif expression.kind is KeywordKind.Switch:
-                return self.parse_switch()
+                expression = self.parse_switch()
+            else:
+                raise TypeError(f'expression must be Ast, found Keyword "{expression.format}". in line {expression.line}. at module {self.module.name}')
 
-            raise TypeError(f'expression must be Ast, found Keyword "{expression.format}". in line {expression.line}. at module {self.module.name}')
-        
-        token = self.source.capture()
-
-        if type(token) is Keyword:
-            if token.kind in KEYWORDKIND_BINARYOPERATORS:
-                return BinaryOperator(expression, token, self.parse_expression(self.source.capture(), terminals=terminals))
-        elif type(token) is Token:
-            if token.kind in terminals:
-                self.source.release()
-                return expression
-            
-            if token.kind in TOKENKIND_BINARYOPERATORS:
-                return BinaryOperator(expression, token, self.parse_expression(self.source.capture(), terminals=terminals))
-            
+        while True:
+            token = self.cursor.peek()
+
+            if not type(token) is Token or token.kind in terminals:
+                break
             elif token.kind is TokenKind.LeftParenthesis:
-                return self.parse_expression(self.parse_call(expression), terminals=terminals)
+                self.cursor.advance()
+
+                expression = self.parse_call(expression)
             elif token.kind is TokenKind.LeftBrace:
-                return self.parse_struct_literal(expression)
+                self.cursor.advance()
+
+                # A struct literal ends the whole expression, it is never an operand of postfix or binary operators
+                expression = self.parse_struct_literal(expression)
+                break
             elif token.kind is TokenKind.Dot:
-                self.source.release()
-                
-                return self.parse_expression(self.parse_attribute(expression), terminals)
-            
+                expression = self.parse_attribute(expression)
             elif token.kind is TokenKind.LeftBracket:
-                self.source.release()
-
-                return self.parse_expression(self.parse_subscript(expression), terminals)
-            
+                expression = self.parse_subscript(expression)
             elif token.kind is TokenKind.Interrogation:
-                return self.parse_expression(TestGuard(expression), terminals)
+                self.cursor.advance()
 
-        self.source.release()
+                expression = TestGuard(expression)
+            else:
+                break
+        
+        for prefix in reversed(prefixes):
+            expression = UnaryOperator(prefix, expression)
 
         return expression
 
+    def parse_expression(self, expression: Expression, terminals: set[TokenKind]=set()):
+        """
+        Precedence climbing over BINARYOPERATOR_PRECEDENCE, done with explicit operand and operator stacks so that
+        long chains don't recurse. A leading 'not' is kept on the operator stack, it binds looser than comparisons
+        """
+
+        if type(expression) is Keyword:
+            if expression.kind is KeywordKind.Comptime:
+                return self.parse_comptime()
+            elif expression.kind is KeywordKind.Switch:
+                return self.parse_switch()
+
+        operands = []
+        operators = []
+
+        def reduce():
+            operator = operators.pop()
+
+            if type(operator) is Keyword and operator.kind in KEYWORDKIND_UNARYOPERATORS:
+                operands.append(UnaryOperator(operator, operands.pop()))
+            else:
+                right = operands.pop()
+                operands.append(BinaryOperator(operands.pop(), operator, right))
+
+        while True:
+            while type(expression) is Keyword and expression.kind in KEYWORDKIND_UNARYOPERATORS:
+                operators.append(expression)
+                expression = self.cursor.advance()
+
+            operands.append(self.parse_operand(expression, terminals))
+
+            if type(operands[-1]) is StructLiteral:
+                break
+
+            token = self.cursor.peek()
+            precedence = BINARYOPERATOR_PRECEDENCE.get(token.kind) if type(token) is Keyword or (type(token) is Token and token.kind not in terminals) else None
+
+            if precedence is None:
+                break
+
+            while operators and OPERATOR_PRECEDENCE[operators[-1].kind] >= precedence + (token.kind in RIGHT_ASSOCIATIVE_OPERATORS):
+                reduce()
+
+            self.cursor.advance()
+            operators.append(token)
+            expression = self.cursor.advance()
+
+        while operators:
+            reduce()
+
+        return operands[0]
+
     def parse_function_head(self) -> FunctionHead:
-        name = self.source.capture()
+        name = self.cursor.advance()
 
         if type(name) is not Name:
             raise TypeError(f"expecting a Name, found '{name.format}'. at line {name.line}")
 
         name = self.parse_type_name(name)
-        token = self.source.capture()
-
-        if not (type(token) is Token and token.kind is TokenKind.LeftParenthesis):
-            raise TypeError(f"expecting '(', found '{token.format}' before argument list of function {name}. at line {token.line}")
+        self.cursor.expect(TokenKind.LeftParenthesis)
         
         arguments = []
 
-        for token in self.source:
+        for token in self.cursor:
             if type(token) is Token and token.kind is TokenKind.RightParenthesis:
                 break
             elif type(token) is Token and token.kind is TokenKind.Comma:
@@ -559,19 +780,13 @@ class Parser:
                 raise TypeError(f'expecting a Name, found {token}. at line {token.line}')
 
             token = self.parse_expression(token)
-            colon = self.source.capture()
+            self.cursor.expect(TokenKind.Colon)
             
-            if not (type(colon) is Token and colon.kind is TokenKind.Colon):
-                raise SyntaxError(f"expecting ':' before parameter type of {token}. in module {self.module.name}")
-            
-            arguments.append((token, self.parse_expression(self.source.capture())))
+            arguments.append((token, self.parse_expression(self.cursor.advance())))
         
-        colon = self.source.capture()
-            
-        if not (type(colon) is Token and colon.kind is TokenKind.Colon):
-            raise SyntaxError(f"expecting ':' before parameter type of {colon}. in module {self.module.name}")
+        self.cursor.expect(TokenKind.Colon)
 
-        return_hint = self.parse_expression(self.source.capture(), terminals={TokenKind.LeftBrace})
+        return_hint = self.parse_expression(self.cursor.advance(), terminals={TokenKind.LeftBrace})
 
         if type(name) is Subscript:
             generic = name.items
@@ -582,17 +797,14 @@ class Parser:
         return FunctionHead(name, arguments, return_hint, generic, self.module)
     
     def parse_assignment(self, name: Name | Attribute, operator: Token) -> Assignment:
-        return Assignment(name, operator, self.parse_expression(self.source.capture()))
+        return Assignment(name, operator, self.parse_expression(self.cursor.advance()))
     
     def parse_body(self) -> Body:
-        left_brace = self.source.capture()
-            
-        if not (type(left_brace) is Token and left_brace.kind is TokenKind.LeftBrace):
-            raise SyntaxError(f"expecting '{{' before body, found {left_brace}")
+        self.cursor.expect(TokenKind.LeftBrace)
         
         lines = []
 
-        for token in self.source:
+        for token in self.cursor:
             if type(token) is Token and token.kind is TokenKind.RightBrace:
                 break
             elif type(token) is Token and token.kind is TokenKind.Comma:
@@ -624,12 +836,12 @@ class Parser:
                     raise NotImplementedError(f'parsing for keyword {token} is not implemented yet')
             elif type(token) is Name:
                 token = self.parse_expression(token)
-                next_token = self.source.capture()
+                next_token = self.cursor.peek()
                 
                 if type(next_token) is Token and next_token.kind in TOKENKIND_ASSIGNMENTOPERATORS:
+                    self.cursor.advance()
                     lines.append(self.parse_assignment(token, next_token))
                 else:
-                    self.source.release()
                     lines.append(token)
             else:
                 raise NotImplementedError(f'parsing for {token} is not implemented yet')
@@ -637,30 +849,24 @@ class Parser:
         return Body(lines)
 
     def parse_extern(self) -> Extern:
-        token = self.source.capture()
+        self.cursor.expect(KeywordKind.Fun)
 
-        if type(token) is Keyword and token.kind is KeywordKind.Fun:
-            return Extern(self.parse_function_head())
-        
-        raise SyntaxError(f'missing keyword fun. at line {token.kind}. in module {self.module.name}')
+        return Extern(self.parse_function_head())
     
     def parse_import(self) -> Import:
-        return Import(self.parse_attribute(self.source.capture()))
+        return Import(self.parse_attribute(self.cursor.advance()))
     
     def parse_enum_declaration(self) -> EnumDeclaration:
-        name = self.source.capture()
+        name = self.cursor.advance()
 
         if type(name) is not Name:
             raise TypeError(f"expecting a Name, found {type(name)}. at line {name.line}")
 
-        left_brace = self.source.capture()
-            
-        if not (type(left_brace) is Token and left_brace.kind is TokenKind.LeftBrace):
-            raise SyntaxError(f"expecting '{{' before body, found {left_brace}")
+        self.cursor.expect(TokenKind.LeftBrace)
         
         fields = []
 
-        for token in self.source:
+        for token in self.cursor:
             if type(token) is Token and token.kind is TokenKind.RightBrace:
                 break
             elif type(token) is Token and token.kind is TokenKind.Comma:
@@ -674,19 +880,16 @@ class Parser:
         return EnumDeclaration(name, fields)
     
     def parse_struct_declaration(self) -> StructDeclaration:
-        name = self.parse_type_name(self.source.capture())
+        name = self.parse_type_name(self.cursor.advance())
 
         if type(name) is Name | type(name) is Subscript:
             raise TypeError(f"expecting a Name or Subscript, found {type(name)}. at line {name.line}")
         
-        left_brace = self.source.capture()
-            
-        if not (type(left_brace) is Token and left_brace.kind is TokenKind.LeftBrace):
-            raise SyntaxError(f"expecting '{{' before body, found {left_brace}")
+        self.cursor.expect(TokenKind.LeftBrace)
         
         fields = []
 
-        for token in self.source:
+        for token in self.cursor:
             if type(token) is Token and token.kind is TokenKind.RightBrace:
                 break
             elif type(token) is Token and token.kind is TokenKind.Comma:
@@ -695,12 +898,9 @@ class Parser:
             if type(token) is not Name:
                 raise TypeError(f'expecting a Name, found {token}. at line {token.line}')
 
-            colon = self.source.capture()
-            
-            if not (type(colon) is Token and colon.kind is TokenKind.Colon):
-                raise SyntaxError(f"expecting ':' before parameter type of {token}")
+            self.cursor.expect(TokenKind.Colon)
             
-            fields.append((token, self.parse_expression(self.source.capture())))
+            fields.append((token, self.parse_expression(self.cursor.advance())))
         
         if type(name) is Subscript:
             generic = name.items
@@ -711,19 +911,16 @@ class Parser:
         return StructDeclaration(name, fields, generic)
     
     def parse_union_declaration(self) -> UnionDeclaration:
-        name = self.parse_type_name(self.source.capture())
+        name = self.parse_type_name(self.cursor.advance())
 
         if type(name) is Name | type(name) is Subscript:
             raise TypeError(f"expecting a Name or Subscript, found {type(name)}. at line {name.line}")
         
-        left_brace = self.source.capture()
-            
-        if not (type(left_brace) is Token and left_brace.kind is TokenKind.LeftBrace):
-            raise SyntaxError(f"expecting '{{' before body, found {left_brace}")
+        self.cursor.expect(TokenKind.LeftBrace)
         
         fields = []
 
-        for token in self.source:
+        for token in self.cursor:
             if type(token) is Token and token.kind is TokenKind.RightBrace:
                 break
             elif type(token) is Token and token.kind is TokenKind.Comma:
@@ -732,12 +929,9 @@ class Parser:
             if type(token) is not Name:
                 raise TypeError(f'expecting a Name, found {token}. at line {token.line}')
 
-            colon = self.source.capture()
-            
-            if not (type(colon) is Token and colon.kind is TokenKind.Colon):
-                raise SyntaxError(f"expecting ':' before parameter type of {token}")
+            self.cursor.expect(TokenKind.Colon)
             
-            fields.append((token, self.parse_expression(self.source.capture())))
+            fields.append((token, self.parse_expression(self.cursor.advance())))
         
         if type(name) is Subscript:
             generic = name.items
@@ -747,100 +941,106 @@ class Parser:
         
         return UnionDeclaration(name, fields, generic)
 
+    def skip_body(self) -> LazyBody:
+        position = self.cursor.position
+        token = brace = self.cursor.expect(TokenKind.LeftBrace)
+        depth = 1
+
+        for token in self.cursor:
+            if type(token) is Token:
+                if token.kind is TokenKind.LeftBrace:
+                    depth += 1
+                elif token.kind is TokenKind.RightBrace:
+                    depth -= 1
+
+                    if depth == 0:
+                        break
+
+        return LazyBody(self, position, Span(brace.span.buffer, brace.span.start, token.span.end), brace.line)
+
     def parse_function_declaration(self) -> FunctionDeclaration:
+        if self.lazy:
+            return FunctionDeclaration(self.parse_function_head(), self.skip_body())
+
         return FunctionDeclaration(self.parse_function_head(), self.parse_body())
     
     def parse_variable_declaration(self) -> VariableDeclaration:
-        name = self.source.capture()
+        name = self.cursor.advance()
 
         if type(name) is not Name:
             raise TypeError(f"expecting a Name, found {type(name)}. at line {name.line}")
 
         hint = None
-        colon = self.source.capture()
+        colon = self.cursor.peek()
             
         if type(colon) is Token and colon.kind is TokenKind.Colon:
-            hint = self.parse_expression(self.source.capture())
-        else:
-            self.source.release()
+            self.cursor.advance()
+            hint = self.parse_expression(self.cursor.advance())
         
-        equal = self.source.capture()
-            
-        if not (type(equal) is Token and equal.kind is TokenKind.Equal):
-            raise SyntaxError(f"expecting '=' before parameter type of let {name.value}. at line {equal.line}. in {self.module.name}")
+        self.cursor.expect(TokenKind.Equal)
 
-        return VariableDeclaration(name, self.parse_expression(self.source.capture()), hint)
+        return VariableDeclaration(name, self.parse_expression(self.cursor.advance()), hint)
     
     def parse_if(self) -> If:
-        true_condition = self.parse_expression(self.source.capture(), terminals={TokenKind.LeftBrace})
+        true_condition = self.parse_expression(self.cursor.advance(), terminals={TokenKind.LeftBrace})
         true_body = self.parse_body()
         false_body = None
 
-        else_keyword = self.source.capture()
+        else_keyword = self.cursor.peek()
 
         if type(else_keyword) is Keyword and else_keyword.kind is KeywordKind.Else:
+            self.cursor.advance()
             false_body = self.parse_body()
         elif type(else_keyword) is Keyword and else_keyword.kind is KeywordKind.Elif:
+            self.cursor.advance()
             false_body = self.parse_if()
-        else:
-            self.source.release()
 
         return If(true_condition, true_body, false_body)
 
     def parse_while(self) -> While:
-        return While(self.parse_expression(self.source.capture(), terminals={TokenKind.LeftBrace}), self.parse_body())
+        return While(self.parse_expression(self.cursor.advance(), terminals={TokenKind.LeftBrace}), self.parse_body())
     
     def parse_for(self) -> While:
-        head_target = self.parse_expression(self.source.capture(), terminals={TokenKind.LeftBrace})
+        head_target = self.parse_expression(self.cursor.advance(), terminals={TokenKind.LeftBrace})
         
-        keyword_in = self.source.capture()
-
-        if not (type(keyword_in) is Keyword and keyword_in.kind is KeywordKind.In):
-            raise SyntaxError(f"`for ... in <iterator>` loop expects keyword `in` before iterator parameter. in module '{self.module.name.format}', at line {keyword_in.line}")
+        self.cursor.expect(KeywordKind.In)
 
-        head_iterator = self.parse_expression(self.source.capture(), terminals={TokenKind.LeftBrace})
+        head_iterator = self.parse_expression(self.cursor.advance(), terminals={TokenKind.LeftBrace})
 
         return For(head_target, head_iterator, self.parse_body())
     
     def parse_return(self) -> Return:
-        return Return(self.parse_expression(self.source.capture()))
+        return Return(self.parse_expression(self.cursor.advance()))
     
     def parse_comptime(self) -> Comptime:
-        left_brace = self.source.capture()
-        self.source.release()
+        left_brace = self.cursor.peek()
 
         if type(left_brace) is Token and left_brace.kind is TokenKind.LeftBrace:
             return Comptime(self.parse_body())
 
-        return Comptime(self.parse_expression(self.source.capture()))
+        return Comptime(self.parse_expression(self.cursor.advance()))
     
     def parse_switch(self) -> Switch:
-        name = self.parse_expression(self.source.capture(), {TokenKind.LeftBrace})
-        left_brace = self.source.capture()
-
-        if not (type(left_brace) is Token and left_brace.kind is TokenKind.LeftBrace):
-            raise SyntaxError(f"expecting '{{' after switch statement head, found {left_brace}. at line {left_brace.line}, in module {self.module.name}.")
+        name = self.parse_expression(self.cursor.advance(), {TokenKind.LeftBrace})
+        self.cursor.expect(TokenKind.LeftBrace)
         
         branches = dict()
 
-        for token in self.source:
+        for token in self.cursor:
             if type(token) is Token and token.kind is TokenKind.RightBrace:
                 break
             elif type(token) is Token and token.kind is TokenKind.Comma:
                 continue
 
             expression = self.parse_expression(token, {TokenKind.Colon})
-            colon = self.source.capture()
-            
-            if not (type(colon) is Token and colon.kind is TokenKind.Colon):
-                raise SyntaxError(f"expecting ':' for brach of switch, found {colon.format}. at line {colon.line}, in module {self.module.name}.")
+            self.cursor.expect(TokenKind.Colon)
             
-            branches[expression] = self.parse_expression(self.source.capture(), {TokenKind.Comma, TokenKind.RightBrace})
+            branches[expression] = self.parse_expression(self.cursor.advance(), {TokenKind.Comma, TokenKind.RightBrace})
 
         return Switch(name, branches)
     
     def parse(self):
-        for token in self.source:
+        for token in self.cursor:
             if type(token) is Keyword:
                 if token.kind is KeywordKind.Extern:
                     yield self.parse_extern()
@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+import functools
+import json
+import time
+
+from .parser import Parser
+
+# Productions of the grammar are the methods of Parser starting with this, and skip_body of lazy parsers
+PRODUCTION_PREFIX = 'parse_'
+PRODUCTIONS = tuple(name for name in dir(Parser) if name.startswith(PRODUCTION_PREFIX)) + ('skip_body',)
+
+@dataclass(slots=True)
+class ProductionStats:
+    calls: int=0
+    seconds: float=0.0
+    max_depth: int=0
+    depth: int=0
+
+@dataclass
+class ParserProfile:
+    """
+    Calls, cumulative time and deepest recursion of the productions of every parser it instruments, by module.
+    Time of a production that recurses is only counted for its outermost call, like the cumulative time of cProfile
+    """
+
+    productions: dict[tuple[str, str], ProductionStats]=field(default_factory=dict)
+
+    def stats(self, module_name: str, production: str) -> ProductionStats:
+        key = module_name, production
+
+        if key not in self.productions:
+            self.productions[key] = ProductionStats()
+
+        return self.productions[key]
+
+    def instrument(self, parser: Parser) -> Parser:
+        """Wraps the productions of this parser alone, other parsers and the class are left untouched"""
+
+        for production in PRODUCTIONS:
+            setattr(parser, production, self.wrap(getattr(parser, production), self.stats(parser.module.name, production)))
+
+        return parser
+
+    def wrap(self, method, stats: ProductionStats):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            stats.calls += 1
+            stats.depth += 1
+            stats.max_depth = max(stats.max_depth, stats.depth)
+            start = time.perf_counter()
+
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats.depth -= 1
+
+                if stats.depth == 0:
+                    stats.seconds += time.perf_counter() - start
+
+        return wrapper
+
+    def rows(self) -> list[dict]:
+        """One row for each production of each module that was called, the most expensive first"""
+
+        rows = [
+            {'module': module_name, 'production': production, 'calls': stats.calls, 'seconds': stats.seconds, 'max_depth': stats.max_depth}
+            for (module_name, production), stats in self.productions.items()
+            if stats.calls
+        ]
+
+        return sorted(rows, key=lambda row: row['seconds'], reverse=True)
+
+    def totals(self) -> list[dict]:
+        """Rows of every module summed by production"""
+
+        totals = {}
+
+        for row in self.rows():
+            total = totals.setdefault(row['production'], {'module': '*', 'production': row['production'], 'calls': 0, 'seconds': 0.0, 'max_depth': 0})
+            total['calls'] += row['calls']
+            total['seconds'] += row['seconds']
+            total['max_depth'] = max(total['max_depth'], row['max_depth'])
+
+        return sorted(totals.values(), key=lambda row: row['seconds'], reverse=True)
+
+    def report(self, limit: int=None) -> str:
+        lines = [f"{'module':<24} {'production':<28} {'calls':>8} {'cumulative':>12} {'per call':>10} {'depth':>6}"]
+
+        for row in (self.totals() + self.rows())[:limit]:
+            lines.append(f"{row['module']:<24} {row['production']:<28} {row['calls']:>8} {row['seconds'] * 1000:>10.3f}ms {row['seconds'] / row['calls'] * 1e6:>8.2f}us {row['max_depth']:>6}")
+
+        return '\n'.join(lines)
+
+    def dump(self, file):
+        json.dump({'totals': self.totals(), 'productions': self.rows()}, file, indent=4)
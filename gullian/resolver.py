@@ -0,0 +1,74 @@
+from dataclasses import dataclass, field
+import os
+
+MODULE_EXTENSION = '.gullian'
+
+# Kept for the whole process, so batch builds list each directory once. Files created after a directory was listed
+# are not seen until clear_caches()
+LISTINGS: dict[str, frozenset[str]] = {}
+LOCATIONS: dict[tuple[tuple[str, ...], str], str | None] = {}
+
+def clear_caches():
+    LISTINGS.clear()
+    LOCATIONS.clear()
+
+def list_files(directory: str) -> frozenset[str]:
+    """Names of the files in directory, empty if it doesn't exist"""
+
+    if directory not in LISTINGS:
+        try:
+            with os.scandir(directory) as entries:
+                LISTINGS[directory] = frozenset(entry.name for entry in entries if entry.is_file())
+        except OSError:
+            LISTINGS[directory] = frozenset()
+
+    return LISTINGS[directory]
+
+@dataclass
+class Resolver:
+    """
+    Finds the file of a module like std.io in an ordered search path: the working directory, the -I directories,
+    the ones in GULLIAN_PATH and GULLIAN_HOME. Modules it resolved are kept for reporting the dependencies
+    """
+
+    search_path: list[str]
+    resolutions: dict[str, str]=field(default_factory=dict)
+
+    def resolve(self, module_name: str) -> str | None:
+        # Relative directories are relative to the working directory of the time of the import
+        search_path = tuple(os.path.abspath(directory) for directory in self.search_path)
+        key = search_path, module_name
+
+        if key not in LOCATIONS:
+            LOCATIONS[key] = self.search(search_path, module_name)
+
+        if LOCATIONS[key] is not None:
+            self.resolutions[module_name] = LOCATIONS[key]
+
+        return LOCATIONS[key]
+
+    def search(self, search_path: tuple[str, ...], module_name: str) -> str | None:
+        *packages, name = module_name.split('.')
+
+        for directory in search_path:
+            package_directory = os.path.join(directory, *packages)
+
+            if name + MODULE_EXTENSION in list_files(package_directory):
+                return os.path.join(package_directory, name + MODULE_EXTENSION)
+
+        return None
+
+    def resolution_map(self) -> dict[str, str]:
+        """Every module resolved so far and the path of its file, in the order they were first imported"""
+
+        return dict(self.resolutions)
+
+    @classmethod
+    def new(cls, include: list[str]=()):
+        search_path = [os.curdir, *include]
+        search_path.extend(directory for directory in os.environ.get('GULLIAN_PATH', '').split(os.pathsep) if directory)
+
+        if 'GULLIAN_HOME' in os.environ:
+            search_path.append(os.environ['GULLIAN_HOME'])
+
+        return cls(search_path)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import Generic, TypeVar
 from typing import Iterable
+import mmap
 
 T = TypeVar('T')
 
@@ -39,4 +40,14 @@ class Source(Generic[T]):
         if self.position < 0:
             self.position = 0
         
-        return
\ No newline at end of file
+        return
+
+def map_file(path: str) -> mmap.mmap | bytes:
+    """Maps a source file read-only, its pages are shared with the OS cache instead of copied into a str"""
+
+    with open(path, 'rb') as file:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return bytes()
@@ -0,0 +1,27 @@
+from .parser import LazyBody
+from .type import Typed
+from .arena import NODE_FIELDS
+
+# The checker replaces the children of every node it checks with typed ones, so each instance gets its own nodes
+TEMPLATE_FIELDS = NODE_FIELDS | {Typed: ('value', 'type_')}
+
+def instantiate(template):
+    """
+    A copy of the body of a generic function for one of its instances. Nodes and containers are copied, leaves like
+    names, literals, tokens, types and modules are never changed by the checker and are shared with the template
+    """
+
+    kind = type(template)
+
+    if kind in TEMPLATE_FIELDS:
+        return kind(*[instantiate(getattr(template, name)) for name in TEMPLATE_FIELDS[kind]])
+    elif kind is list:
+        return [instantiate(item) for item in template]
+    elif kind is tuple:
+        return tuple(instantiate(item) for item in template)
+    elif kind is dict:
+        return {instantiate(key): instantiate(value) for key, value in template.items()}
+    elif kind is LazyBody:
+        return instantiate(template.parse())
+
+    return template
@@ -1,7 +1,8 @@
 from typing import TYPE_CHECKING
 from typing import Generic, TypeVar
-from dataclasses import dataclass
-from random import randint
+from dataclasses import dataclass, field
+from itertools import count
+from copy import deepcopy
 
 from .lexer import Name
 from .parser import Ast, TypeDeclaration, FunctionDeclaration, Subscript
@@ -18,6 +19,8 @@ class Type(Generic[T]):
     associated_functions: dict[Name, FunctionDeclaration]
     declaration: TypeDeclaration=None
     module: "Module"=None
+    # Structure of the type, the same for every compilation. None for the pointers, they have the uid of ptr
+    key: tuple=None
 
     def __repr__(self) -> str:
         return f"Type({self.uid}) {self.name.format}"
@@ -30,6 +33,21 @@ class Type(Generic[T]):
             return self.uid == value.uid
         
         return False
+
+    def __reduce__(self):
+        # Types are hashed by uid, unpicklers may put one in a dictionary before the rest of it is loaded
+        return Type.from_uid, (self.uid,), self.__dict__
+
+    def __deepcopy__(self, memo: dict):
+        # Interned types are shared, copying a generic function keeps referring to the same ones
+        if self.key is not None:
+            return self
+
+        copied = Type.from_uid(self.uid)
+        memo[id(self)] = copied
+        copied.__dict__.update(deepcopy(self.__dict__, memo))
+
+        return copied
     
     def import_any(self, name: Name):
         if type(name) is not Name:
@@ -66,13 +84,110 @@ class Type(Generic[T]):
     @classmethod
     def new(cls, name: Name | str, declaration: TypeDeclaration=None, module: "Module"=None):
         if type(name) is str:
-            return cls(Name(name, 0), cls.gen_uid(), dict(), declaration, module)
-        
-        return cls(name, cls.gen_uid(), dict(), declaration, module)
+            name = Name(name, 0)
+
+        if module is None:
+            return cls(name, next(BASIC_UIDS), dict(), declaration, None, ('basic', name.value))
+
+        head = name.head if type(name) is Subscript else name
+
+        return module.compilation.types.intern(cls(name, 0, dict(), declaration, module), ('declared', module.name, head.value))
     
     @classmethod
-    def gen_uid(cls):
-        return randint(1000, 9999)
+    def from_uid(cls, uid: int):
+        type_ = cls.__new__(cls)
+        type_.uid = uid
+
+        return type_
+
+def type_key(type_: Type) -> tuple:
+    """The key of type_, pointers are keyed by what they point to"""
+
+    if type_.key is None and type_.uid == PTR.uid and type(type_.name) is Subscript:
+        return 'ptr', type_key(type_.name.items[0])
+
+    return type_.key
+
+@dataclass
+class TypeTable:
+    """
+    The types of a compilation by key. Each key gets the next uid, so the same program always has the same uids,
+    and building a specialization like Vector[int] twice gives back the same type
+    """
+
+    types: dict[tuple, Type]
+    uids: set[int]
+    next_uid: int
+
+    def get(self, key: tuple) -> Type | None:
+        return self.types.get(key)
+
+    def intern(self, type_: Type, key: tuple) -> Type:
+        """Gives type_ its key and the next uid, or returns the type already having that key"""
+
+        if key in self.types:
+            return self.types[key]
+
+        type_.uid = self.next_uid
+        type_.key = key
+        self.register(type_)
+
+        return type_
+
+    def register(self, type_: Type):
+        # Types loaded from an interface keep their uid if no other type has it
+        self.types[type_.key] = type_
+        self.uids.add(type_.uid)
+        self.next_uid = max(self.next_uid, type_.uid + 1)
+
+    def mark(self) -> tuple[int, int]:
+        return len(self.types), self.next_uid
+
+    def restore(self, mark: tuple[int, int]):
+        """Forgets the types interned since mark, their uids are given again"""
+
+        length, self.next_uid = mark
+
+        for key in list(self.types)[length:]:
+            self.uids.discard(self.types.pop(key).uid)
+
+    @classmethod
+    def new(cls):
+        return cls(dict(), set(), FIRST_UID)
+
+@dataclass
+class Specializations:
+    """
+    Checked instances of the generic functions of a compilation, by the declaration they were made from, the type
+    it is associated to and the keys of the type arguments. Every instance is copied and checked once
+    """
+
+    # Declarations are kept by id, they live as long as the compilation
+    instances: dict[tuple, object]=field(default_factory=dict)
+    hits: int=0
+    misses: int=0
+
+    def get(self, key: tuple):
+        if key in self.instances:
+            self.hits += 1
+
+            return self.instances[key]
+
+        self.misses += 1
+
+        return None
+
+    def store(self, key: tuple, instance):
+        self.instances[key] = instance
+
+        return instance
+
+    def mark(self) -> int:
+        return len(self.instances)
+
+    def restore(self, mark: int):
+        for key in list(self.instances)[mark:]:
+            del self.instances[key]
 
 @dataclass(repr=False)
 class GenericType:
@@ -104,6 +219,10 @@ class Typed(Generic[T]):
         return hash(self.value)
 
     def __getattr__(self, name: str):
+        # Copies and unpicklers look for special methods before value is set
+        if name.startswith('__'):
+            raise AttributeError(name)
+
         return getattr(self.value, name)
 
 @dataclass
@@ -112,8 +231,13 @@ class AssociatedFunction:
     declaration: FunctionDeclaration
 
     def __getattr__(self, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
         return getattr(self.declaration, name)
-    
+
+BASIC_UIDS = count(1)
+
 TYPE = Type.new('type')
 MODULE = Type.new('module')
 VOID = Type.new('void')
@@ -148,6 +272,8 @@ BASIC_TYPES = {
     'any': ANY
 }
 
+FIRST_UID = next(BASIC_UIDS)
+
 @dataclass
 class FunctionArgument:
     value: Name